@@ -54,8 +54,7 @@ class Puzzle(utils.Puzzle):
 
     def part_one(self, input: utils.Input) -> str | int:
         moons = [
-            Moon(x=ps["x"], y=ps["y"], z=ps["z"])
-            for ps in input.lines().parse("<x={x:d}, y={y:d}, z={z:d}>")
+            Moon(x=x, y=y, z=z) for x, y, z in input.lines().parse("<x={x:d}, y={y:d}, z={z:d}>")
         ]
         for _ in range(100 if self.testing else 1000):
             simulate(moons)
@@ -63,8 +62,7 @@ class Puzzle(utils.Puzzle):
 
     def part_two(self, input: utils.Input) -> str | int:
         og_moons = [
-            Moon(x=ps["x"], y=ps["y"], z=ps["z"])
-            for ps in input.lines().parse("<x={x:d}, y={y:d}, z={z:d}>")
+            Moon(x=x, y=y, z=z) for x, y, z in input.lines().parse("<x={x:d}, y={y:d}, z={z:d}>")
         ]
         cycles: list[int] = []
         # Each axis is independent. Simulate until it cycles. Then take the
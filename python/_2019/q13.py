@@ -49,8 +49,7 @@ class Puzzle(utils.Puzzle):
         # Let's play!
         program = [2] + program[1:]
         game = intcode.IntCode(program)
-        grid = utils.Grid[Tile]([])
-        grid.points = tiles
+        grid = utils.Grid.from_points(tiles)
         ball = grid.find(Tile.BALL)
         paddle = grid.find(Tile.PADDLE)
         score = 0
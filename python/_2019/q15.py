@@ -52,7 +52,7 @@ def new_pos(droid: Droid, command: Command) -> Point:
 class Puzzle(utils.Puzzle):
     def both_parts(self, input: utils.Input) -> tuple[str | int, str | int]:
         init = intcode.IntCode(input.split(",").numbers)
-        grid = utils.Grid.from_string("")
+        grid: utils.SparseGrid[str] = utils.SparseGrid()
         start = (0, 0)
         grid[start] = Tile.DROID
         states: deque[State] = deque([(start, init.fork(), command) for command in Command])
@@ -3,17 +3,16 @@ from __future__ import annotations
 import aocd
 import networkx as nx
 
-from utils import Grid, Point
+from utils import Grid, Point, TiledView
 
 
 def build_graph(data: str) -> tuple[nx.DiGraph, Point, Point, Point]:
     grid = Grid.from_number_string(data)
     original_x, original_y = max(grid)
-    new_grid = grid.replicate(right=5, down=5)
-    for x, y in new_grid:
-        new_grid[x, y] += (x // (original_x + 1)) + (y // (original_y + 1))
-        while new_grid[x, y] > 9:
-            new_grid[x, y] -= 9
+    # Each tile right or down adds one to the risk, wrapping from 9 back to 1.
+    new_grid = TiledView(
+        grid, right=5, down=5, transform=lambda risk, tr, tc: (risk + tr + tc - 1) % 9 + 1
+    )
     return new_grid.to_graph(), (0, 0), (original_x, original_y), max(new_grid)
 
 
@@ -1,11 +1,9 @@
 from __future__ import annotations
 
-import itertools
 import re
 from dataclasses import dataclass
 
 import aocd
-import networkx as nx
 import utils
 
 re_valves = re.compile(r"([A-Z]{2})")
@@ -34,7 +32,7 @@ def solve(raw: str, minutes: int, actors: int) -> int:
     # than branching at each possible destination.
     start = "AA"
     useful: dict[str, int] = {}
-    graph = nx.Graph()
+    tunnels: dict[str, list[str]] = {}
     for line in utils.Input(raw).lines().strings:
         valves = re_valves.findall(line)
         rate = int(re_rate.search(line)[1])
@@ -42,17 +40,12 @@ def solve(raw: str, minutes: int, actors: int) -> int:
         dest_valves = valves[1:]
         if rate > 0:
             useful[curr_valve] = rate
-        for dest in dest_valves:
-            graph.add_edge(curr_valve, dest)
-
-    # Compute all useful paths
-    lengths: dict[frozenset[str], int] = {}
-    for u1, u2 in itertools.combinations(useful, 2):
-        length = nx.shortest_path_length(graph, u1, u2)
-        lengths[frozenset((u1, u2))] = length
-    for u1 in useful:
-        length = nx.shortest_path_length(graph, start, u1)
-        lengths[frozenset((start, u1))] = length
+        tunnels[curr_valve] = dest_valves
+
+    # Compute all useful paths, one BFS per valve
+    valves = [start, *useful]
+    index = {valve: i for i, valve in enumerate(valves)}
+    lengths = utils.poi_distance_matrix(tunnels, valves)
 
     finished: set[Frame] = set()
     # (valve, visited) = (pressure, time)
@@ -75,7 +68,7 @@ def solve(raw: str, minutes: int, actors: int) -> int:
             if path in frame.opened:
                 continue
 
-            cost = lengths[frozenset((frame.valve, path))]
+            cost = lengths[index[frame.valve]][index[path]]
             dest_time = frame.time + cost + 1
             if dest_time <= minutes:
                 try_next.append(
@@ -2,19 +2,17 @@ import itertools
 import math
 
 import aocd
-from parse import parse
 
 import utils
 
 
 def part_one(raw: str) -> int:
-    [[directions], network] = utils.Input(raw).group(sep="\n").strings
+    header, network = utils.Input(raw).group(sep="\n")
+    [directions] = header.strings
 
     indexes = itertools.cycle([int(lr) for lr in directions.replace("L", "0").replace("R", "1")])
     nodes = {
-        parsed["start"]: (parsed["left"], parsed["right"])
-        for line in network
-        if (parsed := parse("{start} = ({left}, {right})", line))
+        start: (left, right) for start, left, right in network.parse("{start} = ({left}, {right})")
     }
     node = "AAA"
     for move_number, index in enumerate(indexes, 1):
@@ -24,14 +22,13 @@ def part_one(raw: str) -> int:
 
 
 def part_two(raw: str) -> int:
-    [[directions], network] = utils.Input(raw).group(sep="\n").strings
+    header, network = utils.Input(raw).group(sep="\n")
+    [directions] = header.strings
     dirs = len(directions)
     nodes = {
-        parsed["start"]: (parsed["left"], parsed["right"])
-        for line in network
-        if (parsed := parse("{start} = ({left}, {right})", line))
+        start: (left, right) for start, left, right in network.parse("{start} = ({left}, {right})")
     }
-    starting_nodes = [key for key in nodes.keys() if key.endswith("A")]
+    starting_nodes = [key for key in nodes if key.endswith("A")]
     steps_to_end: list[int] = []
     for node in starting_nodes:
         step = 0
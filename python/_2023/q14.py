@@ -33,16 +33,16 @@ def north_load(grid: utils.Grid) -> int:
 
 def part_two(raw: str) -> int:
     grid = utils.Input(raw).grid()
+    # Tilting each rotated view north tilts the grid north, west, south, then east.
+    views = [utils.RotatedView(grid, rotations) for rotations in range(4)]
 
     cycles = {}
     n = 0
     target = 1e9
     while n < target:
-        grid = tilt_north(grid).rotate(1)
-        grid = tilt_north(grid).rotate(1)
-        grid = tilt_north(grid).rotate(1)
-        grid = tilt_north(grid).rotate(1)
-        key = grid.hash_key()
+        for view in views:
+            tilt_north(view)
+        key = grid.state_key()
         if key in cycles:
             first_seen = cycles[key]
             where = n - first_seen
@@ -1,9 +1,9 @@
-import heapq
-
 import aocd
 
 import utils
 
+type State = tuple[utils.Point, utils.Point, int]
+
 
 def get_heat(
     grid: utils.Grid,
@@ -13,57 +13,37 @@ def get_heat(
     max_forward: int,
     min_forward: int,
 ) -> int:
-    visited = {}
-    queue = [(0, start, start_direction, 0)]
-
-    def skip(current: utils.Point, direction: utils.Point, steps: int) -> tuple[utils.Point, int]:
-        curr = current
-        scores = 0
-        for _ in range(steps):
-            curr = utils.point_add(curr, direction)
-            if curr not in grid:
-                return current, 0
-            scores += grid[curr]
-        return curr, scores
-
-    while queue:
-        score, current, direction, forward_steps = heapq.heappop(queue)
-        updown_or_leftright = abs(direction[0])
-        if (current, updown_or_leftright, forward_steps) in visited:
-            continue
-
-        if current == goal and forward_steps >= min_forward:
-            return score
-
-        visited[(current, updown_or_leftright, forward_steps)] = score
+    """
+    Find the least heat lost moving from start to goal.
+
+    The state is (position, direction, steps taken in that direction). The crucible must
+    travel min_forward steps before turning or stopping, and at most max_forward.
+    """
 
+    def successors(state: State) -> list[tuple[State, int]]:
+        current, direction, forward_steps = state
         if forward_steps < min_forward:
-            # If we have a minimum number of moves, skip to the end of that, saves about half a second
-            new_current, sum_score = skip(current, direction, min_forward - forward_steps)
-            if new_current != current:
-                heapq.heappush(queue, (score + sum_score, new_current, direction, min_forward))
-            continue
-
-        possible_directions = [direction] if forward_steps < max_forward else []
-        possible_directions.extend((utils.turn_left(direction), utils.turn_right(direction)))
-
-        neighbours = [
-            (node, turn)
-            for turn in possible_directions
-            if ((node := utils.point_add(current, turn)) in grid)
+            turns = [direction]
+        else:
+            turns = [utils.turn_left(direction), utils.turn_right(direction)]
+            if forward_steps < max_forward:
+                turns.append(direction)
+        return [
+            ((node, turn, forward_steps + 1 if turn == direction else 1), grid[node])
+            for turn in turns
+            if (node := utils.point_add(current, turn)) in grid
         ]
-        for nb, new_direction in neighbours:
-            heapq.heappush(
-                queue,
-                (
-                    score + grid[nb],
-                    nb,
-                    new_direction,
-                    forward_steps + 1 if new_direction == direction else 1,
-                ),
-            )
-
-    assert False
+
+    result = utils.dijkstra_search(
+        (start, start_direction, 0),
+        successors,
+        is_target=lambda state: state[0] == goal and state[2] >= min_forward,
+        heuristic=lambda state: utils.manhattan_2d(state[0], goal),
+        # Heat is at most 9 per step, and the heuristic moves by 1
+        queue=utils.BucketQueue(max_weight=10),
+    )
+    assert result.target is not None
+    return result.distances[result.target]
 
 
 def part_one(raw: str) -> int:
@@ -3,12 +3,11 @@ import operator
 from collections import deque
 
 import aocd
-from parse import parse
 
 import utils
 
 parts_template = "{{x={xnum:d},m={mnum:d},a={anum:d},s={snum:d}}}"
-wf_rule_template = "{xmas}{op}{compare:d}:{wf_name}"
+wf_rule_pattern = utils.compile_pattern("{xmas}{op}{compare:d}:{wf_name}")
 OPERATORS = {
     ">": operator.gt,
     "<": operator.lt,
@@ -16,19 +15,18 @@ OPERATORS = {
 
 
 def part_one(raw: str) -> int:
-    workflow_list, part_lists = utils.Input(raw).group("\n\n", "\n").strings
+    workflow_list, part_lists = utils.Input(raw).group("\n\n", "\n")
     accepted_part_lists = []
     rejected_part_lists = []
     parts = []
-    for part_list in part_lists:
-        X, M, A, S = parse(parts_template, part_list).named.values()
+    for X, M, A, S in part_lists.parse(parts_template):
         parts.append({"x": X, "m": M, "a": A, "s": S})
 
     workflows = {}
-    for wf in workflow_list:
+    for wf in workflow_list.strings:
         wf_name, wf_rule_list = wf.split("{")
         *wf_rules, wf_end = wf_rule_list[:-1].split(",")
-        wf_parts = [parse(wf_rule_template, part).named for part in wf_rules]
+        wf_parts = [rule for part in wf_rules if (rule := wf_rule_pattern.parse(part))]
         workflows[wf_name] = (wf_parts, wf_end)
 
     for part in parts:
@@ -36,7 +34,7 @@ def part_one(raw: str) -> int:
         while current_workflow not in ("A", "R"):
             rules, end_state = workflows[current_workflow]
             for rule in rules:
-                xmas, op, compare, new_workflow = rule.values()
+                xmas, op, compare, new_workflow = rule
                 left = part[xmas]
                 if OPERATORS[op](left, compare):
                     current_workflow = new_workflow
@@ -61,7 +59,7 @@ def part_two(raw: str) -> int:
     for wf in workflow_list:
         wf_name, wf_rule_list = wf.split("{")
         *wf_rules, wf_end = wf_rule_list[:-1].split(",")
-        wf_parts = [parse(wf_rule_template, part).named for part in wf_rules]
+        wf_parts = [rule for part in wf_rules if (rule := wf_rule_pattern.parse(part))]
         workflows[wf_name] = (wf_parts, wf_end)
 
     combinations = 0
@@ -77,7 +75,7 @@ def part_two(raw: str) -> int:
 
         rules, last_workflow = workflows[current_workflow]
         for rule in rules:
-            xmas, op, compare, new_workflow = rule.values()
+            xmas, op, compare, new_workflow = rule
             part_num = "xmas".index(xmas)
             lower, high = parts[part_num]
             match op:
@@ -137,7 +135,7 @@ def part_two_alt(raw: str) -> int:
     for wf in workflow_list:
         wf_name, wf_rule_list = wf.split("{")
         *wf_rules, wf_end = wf_rule_list[:-1].split(",")
-        wf_parts = [parse(wf_rule_template, part).named for part in wf_rules]
+        wf_parts = [rule for part in wf_rules if (rule := wf_rule_pattern.parse(part))]
         workflows[wf_name] = wf_parts, wf_end
 
     parts = {
@@ -159,7 +157,7 @@ def combos(parts: dict[str, range], current_workflow: str, workflows: dict) -> i
     our_parts = parts.copy()
     rules, last_workflow = workflows[current_workflow]
     for rule in rules:
-        xmas, op, compare, new_workflow = rule.values()
+        xmas, op, compare, new_workflow = rule
         match op:
             case ">":
                 matched = range(compare + 1, our_parts[xmas].stop)
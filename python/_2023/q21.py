@@ -1,5 +1,3 @@
-from collections import deque
-
 import aocd
 
 import utils
@@ -16,25 +14,10 @@ def part_one(raw: str, steps: int) -> int:
 
 def solve(raw: str, steps: int, start: utils.Point) -> int:
     grid = utils.Input(raw).grid()
-    seen = {}
-    parity = steps % 2
     assert grid[start] == "S"
-    queue = deque([(start, 0)])
-    while queue:
-        # only steps matching parity are admissable
-        point, steps_taken = queue.popleft()
-        if point in seen:
-            continue
-        seen[point] = steps_taken
-
-        if steps_taken >= steps:
-            continue
-
-        for neighbor in grid.get_neighbours(point):
-            if grid[neighbor] == "#":
-                continue
-            queue.append((neighbor, steps_taken + 1))
-    return len([p for p in seen if (seen[p] % 2) == parity])
+    field = grid.distance_field([start], passable=lambda char: char != "#", max_steps=steps)
+    # only steps matching parity are admissable
+    return field.reachable(steps, parity=steps % 2)
 
 
 def part_two(raw: str, steps: int) -> int:
@@ -47,19 +30,20 @@ def part_two(raw: str, steps: int) -> int:
             rows.append(row * 5)
     big_raw = "\n".join(rows)
 
-    # Assume we begin right in the center of the grid. Solve confirms a match.
+    # Assume we begin right in the center of the grid. The assert below confirms a match.
     STEPS_A = size // 2
     STEPS_B = size + STEPS_A
     STEPS_C = size + STEPS_B
-    # print(f"{STEPS_A=} {STEPS_B=} {STEPS_C=}")
     # Start is in the center of the 3x3 grid
     big_start = (STEPS_C, STEPS_C)
-    # print(f"{big_start=}")
     # Solve the first grid, then the second grid (larger, different parity), then the third (same parity as first)
-    s1 = solve(big_raw, STEPS_A, big_start)
-    s2 = solve(big_raw, STEPS_B, big_start)
-    s3 = solve(big_raw, STEPS_C, big_start)
-    # print(f"{s1=} {s2=} {s3=}")
+    # A single walk out to the furthest run answers all three.
+    grid = utils.Input(big_raw).grid()
+    assert grid[big_start] == "S"
+    field = grid.distance_field([big_start], passable=lambda char: char != "#", max_steps=STEPS_C)
+    s1 = field.reachable(STEPS_A, parity=STEPS_A % 2)
+    s2 = field.reachable(STEPS_B, parity=STEPS_B % 2)
+    s3 = field.reachable(STEPS_C, parity=STEPS_C % 2)
 
     # Then we can compute the quadratic sequence (like we did for day 9, but math'd)
     # https://www.radfordmathematics.com/algebra/sequences-series/difference-method-sequences/quadratic-sequences.html
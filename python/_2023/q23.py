@@ -1,7 +1,6 @@
 from collections import deque
 
 import aocd
-import networkx as nx
 
 import utils
 
@@ -35,45 +34,13 @@ def part_one(raw: str) -> int:
     return path_found
 
 
-def to_graph(grid: utils.Grid) -> dict[utils.Point, set[utils.Point]]:
-    # Rather than creating a node per point, create a node per non-branching path.
-    graph = nx.Graph()
-    start = (0, 1)
-    queue = deque([(start, start, 0)])
-    seen = set()
-    while queue:
-        connected_to, curr, weight = queue.popleft()
-        while True:
-            seen.add(curr)
-            nbs = [nb for nb in grid.get_neighbours(curr) if grid[nb] != "#" and nb not in seen]
-            if len(nbs) == 1:
-                curr = nbs[0]
-                weight += 1
-                continue
-            graph.add_edge(connected_to, curr, weight=weight)
-            for nb in nbs:
-                # Start with a weight of 1, not 0
-                queue.append((curr, nb, 1))
-            break
-    return graph
-
-
 def part_two(raw: str) -> int:
     grid = utils.Input(raw).grid()
-    path_found = 0
-    graph = to_graph(grid)
     start = (0, 1)
     target = (grid.height - 1, grid.width - 2)
-    queue = deque([(start, 0, frozenset(set()))])
-    while queue:
-        curr, steps, path = queue.popleft()
-        if curr in path:
-            continue
-        if curr == target:
-            path_found = max(path_found, steps)
-        for nb, attrs in graph[curr].items():
-            queue.appendleft((nb, steps + attrs["weight"], frozenset(path | {curr})))
-    return path_found
+    # Rather than creating a node per point, create a node per non-branching path.
+    graph = grid.contract(lambda tile: tile != "#", keep=[start, target], parallel="longest")
+    return utils.longest_path(graph, start, target)
 
 
 def test():
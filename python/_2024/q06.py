@@ -61,14 +61,9 @@ class Puzzle(utils.Puzzle):
         visited, _ = wander(grid, guard, direction)
         points_crossed = {v[0] for v in visited}
         points_crossed.remove(guard)
-        num_loops = 0
-        for point in points_crossed:
-            grid[point] = "#"
-            _, in_loop = wander(grid, guard, direction)
-            if in_loop:
-                num_loops += 1
-            grid[point] = "."
-        return num_loops
+        # Jump from obstruction to obstruction, laying each new one over the table.
+        table = grid.ray_table("#")
+        return sum(loops(table, guard, direction, point) for point in points_crossed)
 
 
 def wander(
@@ -92,6 +87,20 @@ def wander(
     return visited, False
 
 
+def loops(
+    table: utils.RayTable, guard: utils.Point, direction: utils.Point, obstruction: utils.Point
+) -> bool:
+    turns = set()
+    while True:
+        guard, blocked = table.jump(guard, direction, extra=obstruction)
+        if not blocked:
+            return False
+        if (guard, direction) in turns:
+            return True
+        turns.add((guard, direction))
+        direction = utils.turn_right(direction)
+
+
 if __name__ == "__main__":
     runner = Puzzle(
         year=2024,
@@ -34,7 +34,7 @@ class Puzzle(utils.Puzzle):
         """
         bounds = self.get_bounds(input)
         robots: Robots = []
-        for x, y, vx, vy in input.lines().scan_ints():
+        for x, y, vx, vy in input.ints_array(shape=(-1, 4)).tolist():
             robots.append(Robot(x, y, vx, vy))
 
         for robot in robots:
@@ -51,7 +51,7 @@ class Puzzle(utils.Puzzle):
         """
         bounds = self.get_bounds(input)
         robots: Robots = []
-        for x, y, vx, vy in input.lines().scan_ints():
+        for x, y, vx, vy in input.ints_array(shape=(-1, 4)).tolist():
             robots.append(Robot(x, y, vx, vy))
 
         clones = [Robot(robot.x, robot.y, robot.vx, robot.vy) for robot in robots]
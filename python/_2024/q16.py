@@ -1,9 +1,9 @@
-import heapq
 from copy import deepcopy
 
 import utils
 
 type Point = utils.Point
+type State = tuple[Point, Point]
 
 
 class Puzzle(utils.Puzzle):
@@ -19,53 +19,28 @@ class Puzzle(utils.Puzzle):
         grid = input.grid()
         start = grid.find("S")
         end = grid.find("E")
-        direction = utils.RIGHT
-        heap: list[tuple[int, Point, Point, set[Point], bool]] = []
-        seen: dict[tuple[Point, Point], tuple[int, set[Point]]] = {}
-        heapq.heappush(heap, (0, start, direction, set(), False))
-        best_score = int(1e9)
-        best_path: set[Point] = set()
-        while heap:
-            distance, position, direction, path, did_turn = heapq.heappop(heap)
-            if position not in grid or grid[position] == "#":
-                continue
 
-            key = (position, direction)
-            new_path = path | {position}
-
-            if position == end and distance <= best_score:
-                best_score = distance
-                best_path = new_path if distance < best_score else best_path | new_path
-                continue
-
-            if key in seen:
-                seen_distance, seen_path = seen[key]
-                if seen_distance == distance and path != seen_path:
-                    # If matching, combine the good paths
-                    new_path |= seen_path
-                    seen[key] = distance, new_path
-                elif seen_distance > distance:
-                    # If better, replace the path
-                    seen[key] = distance, new_path
-                else:
-                    continue
-                # We must continue to explore from here now that we have our bigger path
-
-            seen[key] = distance, new_path
-            heapq.heappush(
-                heap,
-                (distance + 1, utils.point_add(position, direction), direction, new_path, False),
-            )
-            if not did_turn:
-                # Stop trying to turn back
-                heapq.heappush(
-                    heap, (distance + 1000, position, utils.turn_right(direction), new_path, True)
-                )
-                heapq.heappush(
-                    heap, (distance + 1000, position, utils.turn_left(direction), new_path, True)
-                )
-
-        return best_score, len(best_path)
+        def successors(state: State) -> list[tuple[State, int]]:
+            position, direction = state
+            moves = [
+                ((position, utils.turn_right(direction)), 1000),
+                ((position, utils.turn_left(direction)), 1000),
+            ]
+            forward = utils.point_add(position, direction)
+            if grid.get(forward, "#") != "#":
+                moves.append(((forward, direction), 1))
+            return moves
+
+        result = utils.dijkstra_search((start, utils.RIGHT), successors, queue=utils.RadixHeap())
+        arrivals = [
+            (end, direction)
+            for direction in utils.DIRECTIONS_4
+            if (end, direction) in result.distances
+        ]
+        best_score = min(result.distances[arrival] for arrival in arrivals)
+        best_arrivals = [arrival for arrival in arrivals if result.distances[arrival] == best_score]
+        tiles = {position for position, _ in result.nodes_on_any_shortest_path(*best_arrivals)}
+        return best_score, len(tiles)
 
 
 def print_path(grid, path, loc, dir):  # type: ignore
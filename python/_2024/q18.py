@@ -1,4 +1,3 @@
-from copy import deepcopy
 from typing import cast
 
 import utils
@@ -43,33 +42,13 @@ class Puzzle(utils.Puzzle):
         is_test = input.data == self.test_input
         corruptions = cast(list[Point], input.split("\n").scan_ints())
         size = 7 if is_test else 71
-        search_from = 12 if is_test else 1024
-        empty_grid = utils.Grid(rows=[["." for _ in range(size)] for _ in range(size)])
+        grid = utils.Grid(rows=[["." for _ in range(size)] for _ in range(size)])
         start = (0, 0)
         target = (size - 1, size - 1)
-
-        def build_grid(t: int) -> utils.Grid[str]:
-            new_grid = deepcopy(empty_grid)
-            for c, r in corruptions[:t]:
-                new_grid[r, c] = "#"
-            return new_grid
-
-        def reachable(t: int) -> bool:
-            grid = build_grid(t)
-            return target in utils.dijkstra_best_score(grid, start, target, unmovable="#")
-
-        # Binary search for the first unreachable
-        min_search = search_from
-        max_search = len(corruptions)
-        while True:
-            if min_search == max_search:
-                break
-            search = (min_search + max_search) // 2
-            if reachable(search):
-                min_search = search + 1
-            else:
-                max_search = search
-        return ",".join(str(p) for p in corruptions[min_search - 1])
+        # Corruptions are (x, y), the grid is (row, column)
+        first = grid.first_disconnect(start, target, [(r, c) for c, r in corruptions])
+        assert first is not None
+        return ",".join(str(p) for p in corruptions[first])
 
 
 if __name__ == "__main__":
@@ -1,20 +1,5 @@
-import itertools
-
 import utils
 
-type Point = utils.Point
-type Steps = int
-
-
-def how_many_shortcuts(best: dict[Point, Steps], max_steps: int, saving_goal: int) -> int:
-    ans = 0
-    for found, other in itertools.combinations(best, 2):
-        dist = utils.manhattan_2d(found, other)
-        if not (1 < dist <= max_steps):
-            continue
-        ans += abs(best[other] - best[found]) - dist >= saving_goal
-    return ans
-
 
 class Puzzle(utils.Puzzle):
     """
@@ -31,10 +16,9 @@ class Puzzle(utils.Puzzle):
         """
         grid = input.grid()
         start = grid.find("S")
-        end = grid.find("E")
-        best = utils.dijkstra_best_score(grid, start, end, unmovable="#")
-        p1 = how_many_shortcuts(best, 2, saving_goal=2 if self.testing else 100)
-        p2 = how_many_shortcuts(best, 20, saving_goal=50 if self.testing else 100)
+        best = grid.distance_field([start], passable=lambda char: char != "#").as_array()
+        p1 = utils.count_pairs_within(best, 2, threshold=2 if self.testing else 100)
+        p2 = utils.count_pairs_within(best, 20, threshold=50 if self.testing else 100)
         return p1, p2
 
 
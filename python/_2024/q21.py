@@ -16,7 +16,7 @@ def get_keygrid() -> utils.Grid[str]:
 456
 123
 #0A""")
-    del grid.points[grid.find("#")]
+    del grid[grid.find("#")]
     return grid
 
 
@@ -24,7 +24,7 @@ def get_dirgrid() -> utils.Grid[str]:
     grid = utils.Grid.from_string("""#^A
 <v>""")
 
-    del grid.points[grid.find("#")]
+    del grid[grid.find("#")]
     return grid
 
 
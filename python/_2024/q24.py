@@ -1,10 +1,10 @@
 from dataclasses import dataclass
 from graphlib import TopologicalSorter
 
-from parse import parse
-
 import utils
 
+GATE = "{left} {gate_type} {right} -> {output}"
+
 
 @dataclass
 class Wire:
@@ -24,19 +24,18 @@ def get_bits(wires: dict[str, Wire], prefix: str) -> str:
 
 class Puzzle(utils.Puzzle):
     def part_one(self, input: utils.Input) -> str | int:
-        init, gates = input.group(sep="\n").strings
+        init, gates = input.group(sep="\n")
         topo: TopologicalSorter[str] = TopologicalSorter()
         wires = {}
-        for gate_str in gates:
-            gate = parse("{left} {gate_type} {right} -> {output}", gate_str)
-            topo.add(gate["output"], gate["left"], gate["right"])
-            wires[gate["output"]] = Wire(
-                name=gate["output"],
+        for left, gate_type, right, output in gates.parse(GATE):
+            topo.add(output, left, right)
+            wires[output] = Wire(
+                name=output,
                 output=None,
-                inputs=(gate["left"], gate["right"]),
-                gate_type=gate["gate_type"],
+                inputs=(left, right),
+                gate_type=gate_type,
             )
-        for i in init:
+        for i in init.strings:
             wname, val = i.split(": ")
             wires[wname] = Wire(
                 name=wname, output=bool(int(val)), inputs=("", ""), gate_type="identity"
@@ -49,15 +48,14 @@ class Puzzle(utils.Puzzle):
     def part_two(self, input: utils.Input) -> str | int:
         if self.testing:
             return "no-answer"
-        _, gates = input.group(sep="\n").strings
+        _, gates = input.group(sep="\n")
         wires: dict[str, Wire] = {}
-        for gate_str in gates:
-            gate = parse("{left} {gate_type} {right} -> {output}", gate_str)
-            wires[gate["output"]] = Wire(
-                name=gate["output"],
+        for left, gate_type, right, output in gates.parse(GATE):
+            wires[output] = Wire(
+                name=output,
                 output=None,
-                inputs=(gate["left"], gate["right"]),
-                gate_type=gate["gate_type"],
+                inputs=(left, right),
+                gate_type=gate_type,
             )
 
         bad_wires = set()
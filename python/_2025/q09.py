@@ -5,7 +5,8 @@ import utils
 
 class Puzzle(utils.Puzzle):
     def part_one(self, input: utils.Input) -> str | int:
-        points = [(pair[0], pair[1]) for pair in input.lines().split(",").integers]
+        ints = input.ints_array()
+        points = list(zip(ints[0::2], ints[1::2], strict=True))
         areas = sorted(
             [utils.Rect.from_corners(p1, p2).area for p1, p2 in itertools.combinations(points, 2)],
             reverse=True,
@@ -13,7 +14,8 @@ class Puzzle(utils.Puzzle):
         return areas[0]
 
     def part_two(self, input: utils.Input) -> str | int:
-        points = [(pair[0], pair[1]) for pair in input.lines().split(",").integers]
+        ints = input.ints_array()
+        points = list(zip(ints[0::2], ints[1::2], strict=True))
         rectangles = sorted(
             [utils.Rect.from_corners(p1, p2) for p1, p2 in itertools.combinations(points, 2)],
             key=lambda box: box.area,
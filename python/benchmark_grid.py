@@ -0,0 +1,80 @@
+"""
+Benchmark grid heavy puzzles against the dict backed Grid and the list backed DenseGrid.
+
+    $ uv run benchmark_grid.py
+    $ uv run benchmark_grid.py --puzzle 2024/6 --repeat 3
+"""
+
+import argparse
+import functools
+import importlib
+import time
+from collections.abc import Callable, Sequence
+from unittest import mock
+
+import aocd
+
+import utils
+
+PUZZLES = ["2024/6", "2023/14", "2023/16"]
+
+type Part = Callable[[str], str | int]
+
+
+def load_parts(year: int, day: int) -> Sequence[tuple[str, Part]]:
+    """
+    Find the part one and part two callables of a puzzle, which take the raw input.
+    """
+    module = importlib.import_module(f"_{year}.q{day:02d}")
+    if hasattr(module, "Puzzle"):
+        puzzle = module.Puzzle(year=year, day=day)
+        return [
+            ("part_one", lambda raw: puzzle.part_one(utils.Input(raw))),
+            ("part_two", lambda raw: puzzle.part_two(utils.Input(raw))),
+        ]
+    return [("part_one", module.part_one), ("part_two", module.part_two)]
+
+
+def run(part: Part, data: str, dense: bool, repeat: int) -> tuple[str | int, float]:
+    """
+    Run the part with Input.grid() and Input.grid_int() returning the chosen backend.
+
+    Returns the answer and the best time in seconds.
+    """
+    grid = functools.partialmethod(utils.Input.grid, dense=dense)
+    grid_int = functools.partialmethod(utils.Input.grid_int, dense=dense)
+    best = float("inf")
+    answer: str | int = ""
+    with (
+        mock.patch.object(utils.Input, "grid", grid),
+        mock.patch.object(utils.Input, "grid_int", grid_int),
+    ):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            answer = part(data)
+            best = min(best, time.perf_counter() - start)
+    return answer, best
+
+
+def benchmark(puzzles: Sequence[str], repeat: int) -> None:
+    print(f"{'puzzle':<10} {'part':<9} {'Grid':>9} {'DenseGrid':>10} {'speedup':>8}")
+    for puzzle in puzzles:
+        year, day = map(int, puzzle.split("/"))
+        data = aocd.get_data(day=day, year=year)
+        for name, part in load_parts(year, day):
+            sparse_answer, sparse_time = run(part, data, dense=False, repeat=repeat)
+            dense_answer, dense_time = run(part, data, dense=True, repeat=repeat)
+            if sparse_answer != dense_answer:
+                raise ValueError(f"{puzzle} {name}: {sparse_answer} != {dense_answer}")
+            print(
+                f"{puzzle:<10} {name:<9} {sparse_time:>8.3f}s {dense_time:>9.3f}s "
+                f"{sparse_time / dense_time:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--puzzle", action="append", help="year/day, eg 2024/6")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+    benchmark(args.puzzle or PUZZLES, args.repeat)
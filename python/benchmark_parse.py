@@ -0,0 +1,96 @@
+"""
+Benchmark parse.parse against the compiled and cached utils.compile_pattern.
+
+    $ uv run benchmark_parse.py
+    $ uv run benchmark_parse.py --lines 50000 --repeat 3
+"""
+
+import argparse
+import random
+import time
+from collections.abc import Callable, Sequence
+from typing import Any
+
+import parse
+
+import utils
+
+PATTERNS: dict[str, tuple[str, Callable[[random.Random], str]]] = {
+    "2019/12": (
+        "<x={x:d}, y={y:d}, z={z:d}>",
+        lambda r: f"<x={r.randint(-20, 20)}, y={r.randint(-20, 20)}, z={r.randint(-20, 20)}>",
+    ),
+    "2022/15": (
+        "Sensor at x={:d}, y={:d}: closest beacon is at x={:d}, y={:d}",
+        lambda r: "Sensor at x={}, y={}: closest beacon is at x={}, y={}".format(
+            *(r.randint(-(10**6), 4 * 10**6) for _ in range(4))
+        ),
+    ),
+    "2023/19": (
+        "{xmas}{op}{compare:d}:{wf_name}",
+        lambda r: (
+            f"{r.choice('xmas')}{r.choice('<>')}{r.randint(1, 4000)}:{r.choice(['A', 'R', 'qkq'])}"
+        ),
+    ),
+    "2024/24": (
+        "{left} {gate_type} {right} -> {output}",
+        lambda r: (
+            f"x{r.randint(0, 44):02} {r.choice(['AND', 'OR', 'XOR'])} y{r.randint(0, 44):02} -> z{r.randint(0, 45):02}"
+        ),
+    ),
+}
+
+
+def with_parse(pattern: str, lines: Sequence[str]) -> list[tuple[Any, ...]]:
+    results = []
+    for line in lines:
+        result = parse.parse(pattern, line)
+        results.append((*result.fixed, *result.named.values()))
+    return results
+
+
+def with_compile_pattern(pattern: str, lines: Sequence[str]) -> list[tuple[Any, ...]]:
+    return list(utils.InputList(data=map(utils.Input, lines)).parse(pattern))
+
+
+def run(
+    parser: Callable[[str, Sequence[str]], list[tuple[Any, ...]]],
+    pattern: str,
+    lines: Sequence[str],
+    repeat: int,
+) -> tuple[list[tuple[Any, ...]], float]:
+    """
+    Returns the parsed lines and the best time in seconds.
+    """
+    best = float("inf")
+    results: list[tuple[Any, ...]] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = parser(pattern, lines)
+        best = min(best, time.perf_counter() - start)
+    return results, best
+
+
+def benchmark(puzzles: Sequence[str], lines: int, repeat: int) -> None:
+    rng = random.Random(2024)
+    print(f"{'puzzle':<10} {'parse':>9} {'compiled':>9} {'speedup':>8}")
+    for puzzle in puzzles:
+        pattern, make_line = PATTERNS[puzzle]
+        data = [make_line(rng) for _ in range(lines)]
+        parse_results, parse_time = run(with_parse, pattern, data, repeat)
+        compiled_results, compiled_time = run(with_compile_pattern, pattern, data, repeat)
+        if parse_results != compiled_results:
+            raise ValueError(f"{puzzle}: compile_pattern disagrees with parse")
+        print(
+            f"{puzzle:<10} {parse_time:>8.3f}s {compiled_time:>8.3f}s "
+            f"{parse_time / compiled_time:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--puzzle", action="append", choices=list(PATTERNS))
+    parser.add_argument("--lines", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+    benchmark(args.puzzle or list(PATTERNS), args.lines, args.repeat)
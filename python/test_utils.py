@@ -1,5 +1,11 @@
+import itertools
+import os
+import pathlib
+import subprocess
+import sys
 from textwrap import dedent
 
+import parse
 import pytest
 
 from . import utils
@@ -162,6 +168,141 @@ class TestInputList:
         assert utils.Input(data).lines().split(",").strings == [["abc", "123"], ["def", "456"]]
 
 
+class TestInputSpans:
+    @pytest.mark.parametrize("sep", [None, "\n", ",", "\n\n", "ab"])
+    @pytest.mark.parametrize("data", ["", "a,b\n\nc ab d\n", "  x  y\t\n z ", "abab,,ab\n\n\n"])
+    def test_split_matches_str_split(self, data, sep):
+        assert utils.Input(data).split(sep).strings == data.split(sep)
+
+    def test_shared_buffer(self):
+        data = "1 2\n3 4\n\n5 6"
+        group = utils.Input(data).group("\n\n", "\n")
+        assert group.buffer is data
+        assert all(lst.buffer is data for lst in group)
+        assert len(group) == 2
+        assert list(group.spans) == [0, 3, 4, 7, 9, 12]
+
+    def test_cached(self):
+        lines = utils.Input("1\n2\n3").lines()
+        assert lines._cached_strings() is lines._cached_strings()
+        assert len(lines) == 3
+        assert [inp.integer for inp in lines] == [1, 2, 3]
+        assert lines.data[1] == utils.Input("2")
+
+    def test_mutation_is_safe(self):
+        group = utils.Input("3\n1\n2\n\n4").group()
+        lines = group.data[0]
+        strings, integers = lines.strings, lines.integers
+        strings.pop()
+        integers.sort()
+        group.strings[0].clear()
+        assert lines.strings == ["3", "1", "2"]
+        assert lines.integers == [3, 1, 2]
+        assert group.strings == [["3", "1", "2"], ["4"]]
+
+    def test_from_inputs(self):
+        lines = utils.InputList(data=[utils.Input("ab"), utils.Input(""), utils.Input("c")])
+        assert lines.strings == ["ab", "", "c"]
+        assert lines.split("b").strings == [["a", ""], [""], ["c"]]
+
+
+class TestIntsArray:
+    def test_matches_scan_ints(self):
+        for data in ["p=0,4 v=3,-3", "1-2 --3 - 4", "x", "", "a12b-7c", "1\n\n-20\n"]:
+            assert list(utils.ints_array(data)) == utils.scan_ints(data)
+
+    def test_array(self):
+        ints = utils.Input("162,817,812\n57,618,-57").ints_array()
+        assert ints.typecode == "q"
+        assert list(ints) == [162, 817, 812, 57, 618, -57]
+
+    def test_shape(self):
+        robots = utils.Input("p=0,4 v=3,-3\np=6,3 v=-1,-3").ints_array(shape=(-1, 4))
+        assert robots.shape == (2, 4)
+        assert str(robots.dtype) == "int64"
+        assert robots.tolist() == [[0, 4, 3, -3], [6, 3, -1, -3]]
+
+    def test_matrix(self):
+        lines = utils.Input("1,2,3\n4,5,-6").lines()
+        assert lines.ints_matrix().tolist() == [[1, 2, 3], [4, 5, -6]]
+        assert lines.ints_matrix(3).shape == (2, 3)
+        with pytest.raises(ValueError):
+            lines.ints_matrix(2)
+        with pytest.raises(ValueError):
+            utils.Input("1,2\n3").lines().ints_matrix()
+        # The total matches two columns, but the rows don't line up.
+        with pytest.raises(ValueError, match="line 1"):
+            utils.Input("1 2 3\n4").lines().ints_matrix(2)
+
+
+class TestCompilePattern:
+    def test_cached(self):
+        assert utils.compile_pattern("{:d}-{:d}") is utils.compile_pattern("{:d}-{:d}")
+
+    def test_positional(self):
+        pattern = utils.compile_pattern("{:d}-{:d},{}")
+        assert pattern.regex is not None
+        assert pattern.parse("2-4,-6 or 8") == (2, 4, "-6 or 8")
+        assert pattern.parse("2-4") is None
+
+    def test_named(self):
+        pattern = utils.compile_pattern("<x={x:d}, y={y:d}> {{{name}}}")
+        assert pattern.regex is not None
+        parsed = pattern.parse("<X=-1, y=+2> {io}")
+        assert parsed == (-1, 2, "io")
+        assert (parsed.x, parsed.y, parsed.name) == (-1, 2, "io")
+
+    def test_fallback(self):
+        pattern = utils.compile_pattern("{:d} {name:w}")
+        assert pattern.regex is None
+        assert pattern.parse("12 ab") == (12, "ab")
+        assert pattern.parse("12 a b") is None
+        assert utils.compile_pattern("{x:w}={y:d}").parse("a=1").y == 1
+
+    def test_matches_parse(self):
+        for pattern, string in [
+            ("{xmas}{op}{compare:d}:{wf_name}", "a<2006:qkq"),
+            ("{left} {gate_type} {right} -> {output}", "x00 AND y00 -> z00"),
+            ("Game {}: {} {} {}", "Game 1: 3 blue, 4 red"),
+            ("{:d}x{:d}", "10x-3"),
+            # parse's {:d} also takes prefixed numbers, spaces and repeated signs.
+            ("{:d}-{:d}", "0x1f- 2"),
+            ("<x={x:d}>", "<x=0b101>"),
+            ("{}{:d}", "a+-5"),
+            ("{}{:d}", "a -5"),
+            ("{:d}{}", "0x1f"),
+            ("{} {:d}", "a b"),
+        ]:
+            result = parse.parse(pattern, string)
+            expected = result and (*result.fixed, *result.named.values())
+            assert utils.compile_pattern(pattern).parse(string) == expected, (pattern, string)
+
+
+class TestInputStore:
+    def test_read_input(self, tmp_path):
+        path = tmp_path / "1.txt"
+        path.write_bytes(b"1 2\n3 4\r\n\n")
+        assert utils.read_input(path) == "1 2\n3 4"
+        path.write_bytes(b"")
+        assert utils.read_input(path) == ""
+
+    def test_store(self, tmp_path):
+        store = utils.InputStore(root=tmp_path, template="{year}/{day:02d}.txt", fetch=False)
+        assert store.get(2024, 1) is None
+        with pytest.raises(FileNotFoundError):
+            store.load(2024, 1)
+        assert store.save(2024, 1, "abc\n") == tmp_path / "2024" / "01.txt"
+        assert store.load(2024, 1) == utils.Input("abc")
+
+    def test_puzzle_input(self, tmp_path):
+        (tmp_path / "mine.txt").write_text("from path\n")
+        store = utils.InputStore(root=tmp_path, fetch=False)
+        store.save(2024, 3, "from store")
+        puzzle = utils.Puzzle(year=2024, day=3, input_store=store)
+        assert puzzle.get_input(2024, 3).string == "from store"
+        assert puzzle.get_input(2024, 3, path=str(tmp_path / "mine.txt")).string == "from path"
+
+
 class TestInputGroup:
     def test_strings(self):
         data = dedent(
@@ -406,3 +547,1006 @@ class TestScanInts:
     )
     def test_numbers_found(self, data: str, expected: list[int]):
         assert utils.scan_ints(data) == expected
+
+
+class TestDenseGrid:
+    def test_grid(self):
+        data = dedent(
+            """\
+            a.b
+            d.e"""
+        )
+        grid = utils.Input(data).grid(dense=True)
+        assert isinstance(grid, utils.DenseGrid)
+        assert grid[0, 0] == "a"
+        assert grid[1, 2] == "e"
+        assert (1, 2) in grid
+        assert (2, 0) not in grid
+        assert (0, -1) not in grid
+        assert len(grid) == 6
+        assert (grid.height, grid.width) == (2, 3)
+        with pytest.raises(KeyError):
+            grid[-1, 0]
+
+    def test_grid_int(self):
+        grid = utils.Input("123\n456").grid_int(dense=True)
+        assert list(grid.rows()) == [[1, 2, 3], [4, 5, 6]]
+        assert list(grid.cols()) == [[1, 4], [2, 5], [3, 6]]
+
+    def test_find(self):
+        grid = utils.Input("a.b\nd.b").grid(dense=True)
+        assert grid.find("b") == (0, 2)
+        assert list(grid.find_all("b")) == [(0, 2), (1, 2)]
+        with pytest.raises(ValueError):
+            grid.find("z")
+
+    def test_set(self):
+        grid = utils.Input("ab\ncd").grid(dense=True)
+        grid[1, 0] = "x"
+        assert grid.strings() == ["ab", "xd"]
+        with pytest.raises(KeyError):
+            grid[2, 0] = "x"
+
+    def test_neighbours(self):
+        grid = utils.Input("abc\ndef\nghi").grid(dense=True)
+        assert list(grid.get_neighbours((0, 0))) == [(0, 1), (1, 0)]
+        assert len(list(grid.get_neighbours((1, 1), diag=True))) == 8
+        assert list(grid.get_neighbours((1, 1))) == list(
+            utils.Input("abc\ndef\nghi").grid().get_neighbours((1, 1))
+        )
+
+    def test_matches_grid(self):
+        data = "abc\n123"
+        grid = utils.Input(data).grid()
+        dense = utils.Input(data).grid(dense=True)
+        assert dense.strings() == grid.strings()
+        assert dense.hash_key() == grid.hash_key()
+        assert dense.points == grid.points
+        assert dense.rotate(1).strings() == grid.rotate(1).strings()
+        assert dense.transpose().strings() == grid.transpose().strings()
+        assert set(dense.to_graph().edges) == set(grid.to_graph().edges)
+
+    def test_strings_missing(self):
+        grid = utils.DenseGrid([["a", None], [None, "d"]])
+        assert grid.strings() == ["a?", "?d"]
+        assert grid.strings(missing=".") == ["a.", ".d"]
+        assert utils.Input("ab\ncd").grid(dense=True).strings(missing=".") == ["ab", "cd"]
+
+    def test_points_view(self):
+        grid = utils.Input("ab\ncd").grid(dense=True)
+        points = grid.points
+        assert points[1, 0] == "c"
+        assert (2, 0) not in points
+        assert points.get((2, 0)) is None
+        assert list(points) == [(0, 0), (0, 1), (1, 0), (1, 1)]
+        grid[1, 0] = "x"
+        assert points[1, 0] == "x"
+        with pytest.raises(TypeError):
+            points[0, 0] = "z"
+        with pytest.raises(KeyError):
+            points[-1, 0]
+
+    def test_replicate(self):
+        data = "ab\ncd"
+        dense = utils.Input(data).grid(dense=True)
+        assert dense.replicate(2, 2).strings() == utils.Input(data).grid().replicate(2, 2).strings()
+
+
+class TestGridArray:
+    def test_as_array(self):
+        grid = utils.Input("123\n456").grid_int()
+        array = grid.as_array()
+        assert array.shape == (2, 3)
+        assert array.tolist() == [[1, 2, 3], [4, 5, 6]]
+        assert utils.Grid.from_array(array).points == grid.points
+
+    def test_dense_as_array(self):
+        grid = utils.Input("123\n456").grid_int(dense=True)
+        assert grid.as_array().tolist() == [[1, 2, 3], [4, 5, 6]]
+        assert isinstance(utils.DenseGrid.from_array(grid.as_array()), utils.DenseGrid)
+
+    def test_mask(self):
+        grid = utils.Input("#.\n.#").grid()
+        assert grid.mask("#").tolist() == [[True, False], [False, True]]
+        assert grid.count_values() == {"#": 2, ".": 2}
+
+    def test_neighbour_sum(self):
+        mask = utils.Input("##\n.#").grid().mask("#")
+        assert utils.neighbour_sum(mask).tolist() == [[1, 2], [2, 1]]
+        assert utils.neighbour_sum(mask, diagonal=True).tolist() == [[2, 2], [3, 2]]
+
+    def test_search_masked(self):
+        data = dedent(
+            """\
+            @@@
+            @@@
+            .@."""
+        )
+        grid = utils.Input(data).grid()
+
+        def fewer_than_4(candidate, neighbours):
+            return candidate[1] == "@" and sum(1 for nb in neighbours if nb[1] == "@") < 4
+
+        expected = list(grid.search(fewer_than_4, diagonal=True))
+        found = list(grid.search_masked("@", lambda counts: counts < 4, diagonal=True))
+        assert found == expected
+        assert found == [((0, 0), "@"), ((0, 2), "@"), ((2, 1), "@")]
+
+
+class TestNeighbourIndex:
+    data = dedent(
+        """\
+        abc
+        def
+        ghi"""
+    )
+
+    @pytest.mark.parametrize("dense", [False, True])
+    def test_neighbours_match(self, dense):
+        grid = utils.Input(self.data).grid(dense=dense)
+        indexed = utils.Input(self.data).grid(dense=dense).index_neighbours()
+        for point in grid:
+            for diag in (False, True):
+                assert list(indexed.get_neighbours(point, diag=diag)) == list(
+                    grid.get_neighbours(point, diag=diag)
+                )
+                assert list(indexed.get_neigbours_wrapping(point, diag=diag)) == list(
+                    grid.get_neigbours_wrapping(point, diag=diag)
+                )
+        assert indexed.neighbour_index is not None
+        assert len(indexed.neighbour_index.tables) == 4
+
+    def test_table(self):
+        grid = utils.Input("ab\ncd").grid().index_neighbours()
+        offsets, neighbours = grid.neighbour_index.table()
+        assert list(offsets) == [0, 2, 4, 6, 8]
+        assert list(neighbours) == [1, 2, 3, 0, 0, 3, 1, 2]
+
+    def test_invalidated_on_new_point(self):
+        grid = utils.Input("ab\ncd").grid().index_neighbours()
+        index = grid.neighbour_index
+        grid[0, 0] = "x"
+        assert grid.neighbour_index is index
+        grid[0, 2] = "e"
+        assert grid.neighbour_index is not index
+        assert list(grid.get_neighbours((0, 1))) == [(0, 2), (1, 1), (0, 0)]
+
+    def test_flood_fill_and_graph(self):
+        data = "aab\nabb\nbbb"
+        grid = utils.Input(data).grid()
+        indexed = utils.Input(data).grid().index_neighbours()
+
+        def same(g, p, nb):
+            return g[p] == g[nb]
+
+        assert indexed.flood_fill((0, 0), same) == grid.flood_fill((0, 0), same)
+        assert set(indexed.to_graph().edges) == set(grid.to_graph().edges)
+
+
+class TestBitGrid:
+    data = dedent(
+        """\
+        #..
+        .O.
+        ..#"""
+    )
+
+    def test_from_grid(self):
+        bits = utils.BitGrid.from_grid(utils.Input(self.data).grid(), "#")
+        assert bits.bits == [0b001, 0b000, 0b100]
+        assert (0, 0) in bits
+        assert (1, 1) not in bits
+        assert (5, 5) not in bits
+        assert list(bits) == [(0, 0), (2, 2)]
+        assert len(bits) == bits.count() == 2
+        assert bits.to_grid().strings() == ["#..", "...", "..#"]
+
+    def test_from_points(self):
+        bits = utils.BitGrid.from_points([(0, 0), (1, 1), (2, 2), (5, 5)], 3, 3)
+        assert bits == utils.BitGrid.from_grid(utils.Input(self.data).grid(), "#O")
+
+    def test_set(self):
+        bits = utils.BitGrid.empty(2, 2)
+        bits[1, 0] = True
+        bits.add((0, 1))
+        assert bits.strings() == [".#", "#."]
+        bits[1, 0] = False
+        assert bits.strings() == [".#", ".."]
+
+    def test_shift(self):
+        bits = utils.BitGrid.from_grid(utils.Input(self.data).grid(), "#")
+        assert bits.shift(utils.RIGHT).strings() == [".#.", "...", "..."]
+        assert bits.shift(utils.LEFT).strings() == ["...", "...", ".#."]
+        assert bits.shift(utils.DOWN).strings() == ["...", "#..", "..."]
+        assert bits.shift(utils.UP).strings() == ["...", "..#", "..."]
+        assert bits.shift(utils.DOWNRIGHT, 2).strings() == ["...", "...", "..#"]
+        assert not bits.shift(utils.DOWN, 5)
+
+    def test_operators(self):
+        a = utils.BitGrid.from_points([(0, 0), (0, 1)], 1, 3)
+        b = utils.BitGrid.from_points([(0, 1), (0, 2)], 1, 3)
+        assert (a & b).strings() == [".#."]
+        assert (a | b).strings() == ["###"]
+        assert (a ^ b).strings() == ["#.#"]
+        assert (a - b).strings() == ["#.."]
+        assert (~a).strings() == ["..#"]
+        with pytest.raises(ValueError):
+            a & utils.BitGrid.empty(2, 3)
+
+    def test_neighbours(self):
+        bits = utils.BitGrid.from_points([(1, 1)], 3, 3)
+        assert bits.neighbours().strings() == [".#.", "#.#", ".#."]
+        assert bits.neighbours(diag=True).strings() == ["###", "#.#", "###"]
+
+
+class TestSparseGrid:
+    def test_grid(self):
+        grid = utils.SparseGrid(rows=["ab", "cd"], tile_size=2)
+        assert grid[1, 0] == "c"
+        assert (1, 0) in grid
+        assert (2, 0) not in grid
+        with pytest.raises(KeyError):
+            grid[2, 0]
+        assert len(grid) == 4
+        assert (grid.height, grid.width) == (2, 2)
+        assert grid.strings() == ["ab", "cd"]
+
+    def test_grows(self):
+        grid: utils.SparseGrid[str] = utils.SparseGrid(tile_size=2)
+        assert grid.strings() == []
+        grid[0, 0] = "x"
+        grid[-3, 4] = "y"
+        grid[-3, 4] = "z"
+        assert len(grid) == 2
+        assert grid.bounds == (-3, 0, 0, 4)
+        assert grid.strings() == ["????z", "?????", "?????", "x????"]
+        assert grid.find("z") == (-3, 4)
+        assert set(grid) == {(0, 0), (-3, 4)}
+        assert list(grid.get_neighbours((0, 1))) == [(0, 0)]
+
+    def test_default(self):
+        grid = utils.SparseGrid(rows=["#"], default=".")
+        assert grid[10, 10] == "."
+        assert (10, 10) not in grid
+        assert len(list(grid.get_neighbours((10, 10)))) == 4
+        assert len(grid) == 1
+        grid[1, 1] = "#"
+        assert grid.strings() == ["#.", ".#"]
+        assert list(grid.rows()) == [["#", "."], [".", "#"]]
+
+
+class TestGridBounds:
+    def test_bounds(self):
+        grid = utils.Input("abc\n123").grid()
+        assert grid.bounds == (0, 1, 0, 2)
+        grid[3, 1] = "x"
+        assert (grid.height, grid.width) == (4, 3)
+        grid[-1, 5] = "y"
+        assert grid.bounds == (-1, 3, 0, 5)
+        assert (grid.height, grid.width) == (4, 6)
+
+    def test_delete(self):
+        grid = utils.Input("abc\n123").grid()
+        del grid[1, 2]
+        assert grid.bounds == (0, 1, 0, 2)
+        del grid[0, 2]
+        assert grid.bounds == (0, 1, 0, 1)
+        assert grid.strings() == ["ab", "12"]
+
+    def test_from_points(self):
+        grid = utils.Grid.from_points({(1, 1): "a", (2, 3): "b"})
+        assert grid.bounds == (1, 2, 1, 3)
+        assert grid.strings() == ["a??", "??b"]
+
+
+class TestGridValueIndex:
+    data = dedent(
+        """\
+        S.#
+        .#E"""
+    )
+
+    def test_find(self):
+        grid = utils.Input(self.data).grid().index_values()
+        assert grid.find("S") == (0, 0)
+        assert set(grid.find_all("#")) == {(0, 2), (1, 1)}
+        assert grid.count(".") == 2
+        assert grid.count("x") == 0
+        with pytest.raises(ValueError):
+            grid.find("x")
+
+    @pytest.mark.parametrize("dense", [False, True])
+    def test_updates(self, dense):
+        grid = utils.Input(self.data).grid(dense=dense).index_values()
+        grid[0, 0] = "."
+        grid[1, 0] = "S"
+        assert grid.find("S") == (1, 0)
+        assert grid.count(".") == 2
+        assert grid.count_values() == {"#": 2, ".": 2, "S": 1, "E": 1}
+        for point in grid.find_all("#"):
+            grid[point] = "."
+        assert grid.count("#") == 0
+
+    def test_delete(self):
+        grid = utils.Input(self.data).grid().index_values()
+        del grid[1, 2]
+        with pytest.raises(ValueError):
+            grid.find("E")
+
+    def test_sparse(self):
+        grid = utils.SparseGrid(rows=["S."]).index_values()
+        grid[5, 5] = "S"
+        assert set(grid.find_all("S")) == {(0, 0), (5, 5)}
+
+
+class TestGridViews:
+    data = dedent(
+        """\
+        abc
+        123"""
+    )
+
+    @pytest.mark.parametrize("rotations", [0, 1, 2, 3, -1, 5])
+    def test_rotated(self, rotations):
+        grid = utils.Input(self.data).grid()
+        view = utils.RotatedView(grid, rotations)
+        assert view.strings() == grid.rotate(rotations).strings()
+        assert list(view) == list(grid.rotate(rotations))
+
+    def test_rotated_write(self):
+        grid = utils.Input(self.data).grid()
+        view = utils.RotatedView(grid, 1)
+        assert view[0, 0] == "1"
+        view[0, 0] = "x"
+        assert grid.strings() == ["abc", "x23"]
+        assert (2, 1) in view
+        assert (1, 2) not in view
+        with pytest.raises(KeyError):
+            view[1, 2] = "y"
+
+    def test_transposed(self):
+        grid = utils.Input(self.data).grid()
+        view = utils.TransposedView(grid)
+        assert view.strings() == grid.transpose().strings()
+        view[2, 1] = "x"
+        assert grid[1, 2] == "x"
+
+    def test_tiled(self):
+        grid = utils.Input("12\n34").grid_int()
+        view = utils.TiledView(grid, right=2, down=2)
+        assert view.strings() == grid.replicate(2, 2).strings()
+        assert len(view) == 16
+        with pytest.raises(TypeError):
+            view[0, 0] = 5
+
+    def test_tiled_transform(self):
+        grid = utils.Input("89").grid_int()
+        view = utils.TiledView(grid, 3, 2, transform=lambda v, tr, tc: (v + tr + tc - 1) % 9 + 1)
+        assert view.strings() == ["899112", "911223"]
+        assert list(view.get_neighbours((0, 5))) == [(1, 5), (0, 4)]
+
+
+class TestGridStateKey:
+    @pytest.fixture(autouse=True)
+    def verify(self, monkeypatch):
+        monkeypatch.setattr(utils.Grid, "verify_state_keys", True)
+
+    @pytest.mark.parametrize(
+        "make",
+        [
+            lambda data: utils.Input(data).grid(),
+            lambda data: utils.Input(data).grid(dense=True),
+            lambda data: utils.SparseGrid(rows=data.splitlines()),
+        ],
+    )
+    def test_incremental(self, make):
+        grid = make("O.#\n.O.")
+        initial = grid.state_key()
+        assert initial == make("O.#\n.O.").state_key()
+        assert initial != make(".O#\n.O.").state_key()
+        grid[0, 0] = "."
+        grid[0, 1] = "O"
+        assert grid.state_key() == make(".O#\n.O.").state_key()
+        grid[0, 1] = "."
+        grid[0, 0] = "O"
+        assert grid.state_key() == initial
+
+    def test_grows(self):
+        grid = utils.Input("ab").grid()
+        grid.state_key()
+        grid[1, 0] = "c"
+        assert grid.state_key() == utils.Input("ab\nc").grid().state_key()
+        del grid[1, 0]
+        assert grid.state_key() == utils.Input("ab").grid().state_key()
+
+    def test_verify(self):
+        grid = utils.Input("ab").grid()
+        grid.state_key()
+        grid.points[0, 0] = "x"
+        with pytest.raises(AssertionError):
+            grid.state_key()
+
+    def test_view(self):
+        grid = utils.Input("ab\ncd").grid()
+        view = utils.RotatedView(grid, 1)
+        key = view.state_key()
+        view[0, 0] = "x"
+        assert view.state_key() == grid.state_key() != key
+
+
+class TestLabelComponents:
+    data = dedent(
+        """\
+        AAAA
+        BBCD
+        BBCC
+        EEEC"""
+    )
+
+    def test_components(self):
+        grid = utils.Input(self.data).grid()
+        components = grid.label_components()
+        summary = [(c.value, c.area, c.perimeter, c.corners) for c in components]
+        assert summary == [
+            ("A", 4, 10, 4),
+            ("B", 4, 8, 4),
+            ("C", 4, 10, 8),
+            ("D", 1, 4, 4),
+            ("E", 3, 8, 4),
+        ]
+        c = components[2]
+        assert c.bounds == (1, 3, 2, 3)
+        assert c.points == [(1, 2), (2, 2), (2, 3), (3, 3)]
+
+    def test_matches_corners(self):
+        grid = utils.Input("OOOOO\nOXOXO\nOOOOO\nOXOXO\nOOOOO").grid()
+        components = grid.label_components()
+        assert len(components) == 5
+        outer = components[0]
+        assert outer.area == 21
+        assert outer.perimeter == 36
+        assert outer.corners == utils.num_sides_of_group(set(outer.points)) == 20
+
+    def test_connectivity(self):
+        grid = utils.Input("#.#\n.#.\n#.#").grid()
+        assert len(grid.label_components()) == 9
+        diagonal = grid.label_components(connectivity=8, key=lambda v: v if v == "#" else None)
+        assert len(diagonal) == 1
+        assert diagonal[0].area == 5
+        with pytest.raises(ValueError):
+            grid.label_components(connectivity=6)
+
+
+class TestDistanceField:
+    data = dedent(
+        """
+        S..#
+        .#..
+        ...#
+        """
+    ).strip()
+
+    def test_distances(self):
+        grid = utils.Input(self.data).grid()
+        field = grid.distance_field([(0, 0)], passable=lambda v: v != "#")
+        assert field[(0, 0)] == 0
+        assert field[(1, 3)] == 4
+        assert field[(2, 2)] == 4
+        assert (0, 3) not in field
+        assert (1, 1) not in field
+        assert field.get((5, 5)) is None
+        with pytest.raises(KeyError):
+            field[(0, 3)]
+        assert len(field) == 9
+        assert field.max_distance == 4
+        assert dict(field.items())[(0, 2)] == 2
+
+    def test_multi_source_and_limit(self):
+        grid = utils.Input(self.data).grid()
+        field = grid.distance_field([(0, 0), (2, 2)], passable=lambda v: v != "#", max_steps=1)
+        assert sorted(field.items()) == [
+            ((0, 0), 0),
+            ((0, 1), 1),
+            ((1, 0), 1),
+            ((1, 2), 1),
+            ((2, 1), 1),
+            ((2, 2), 0),
+        ]
+
+    def test_reachable(self):
+        grid = utils.Input(self.data).grid()
+        field = grid.distance_field([(0, 0)], passable=lambda v: v != "#")
+        assert field.level_sizes == [1, 2, 2, 2, 2]
+        assert field.reachable() == 9
+        assert field.reachable(2) == 5
+        assert field.reachable(4, parity=0) == 5
+        assert field.reachable(3, parity=1) == 4
+
+    def test_matches_best_score(self):
+        grid = utils.Input(self.data).grid()
+        field = grid.distance_field([(0, 0)], passable=lambda v: v != "#")
+        best = utils.dijkstra_best_score(grid, (0, 0), (9, 9), unmovable="#")
+        assert dict(field.items()) == best
+
+
+class TestPairsWithin:
+    def test_offsets(self):
+        assert utils.radius_offsets(1) == [((0, 1), 1), ((1, 0), 1)]
+        assert len(utils.radius_offsets(2)) == 6
+        assert len(utils.radius_offsets(2, diagonal=True)) == 12
+        assert ((1, -1), 1) in utils.radius_offsets(1, diagonal=True)
+
+    @pytest.mark.parametrize("diagonal", [False, True])
+    def test_matches_brute_force(self, diagonal):
+        points = {(r, c) for r in range(6) for c in range(7) if (r * 7 + c) % 3}
+
+        def metric(a, b):
+            dr, dc = abs(a[0] - b[0]), abs(a[1] - b[1])
+            return max(dr, dc) if diagonal else dr + dc
+
+        expected = {
+            frozenset((a, b)): metric(a, b)
+            for a, b in itertools.combinations(points, 2)
+            if metric(a, b) <= 3
+        }
+        batches = list(utils.pairs_within(points, 3, diagonal=diagonal, batch_size=10))
+        assert all(len(batch) >= 10 for batch in batches[:-1])
+        found = [(frozenset((a, b)), distance) for batch in batches for a, b, distance in batch]
+        assert len(found) == len(expected)
+        assert dict(found) == expected
+
+    def test_count(self):
+        grid = utils.Input(
+            dedent(
+                """
+                #####
+                #S..#
+                ###.#
+                #E..#
+                #####
+                """
+            ).strip()
+        ).grid()
+        field = grid.distance_field([grid.find("S")], passable=lambda v: v != "#")
+        values = field.as_array()
+        assert values.shape == (5, 5)
+        # S(0) to E(6) through the wall saves 6 - 2 = 4.
+        assert utils.count_pairs_within(values, 2, threshold=4) == 1
+        assert utils.count_pairs_within(values, 2, threshold=2) == 2
+        best = dict(field.items())
+        brute = sum(
+            abs(best[a] - best[b]) - d >= 2
+            for batch in utils.pairs_within(best, 2)
+            for a, b, d in batch
+        )
+        assert brute == 2
+
+
+class TestPoiDistanceMatrix:
+    def test_mapping(self):
+        tunnels = {"AA": ["BB", "DD"], "BB": ["AA", "CC"], "CC": ["BB"], "DD": ["AA"], "EE": []}
+        matrix = utils.poi_distance_matrix(tunnels, ["AA", "CC", "DD", "EE"])
+        assert matrix == [
+            [0, 2, 1, -1],
+            [2, 0, 3, -1],
+            [1, 3, 0, -1],
+            [-1, -1, -1, 0],
+        ]
+
+    def test_grid(self):
+        grid = utils.Input(
+            dedent(
+                """
+                0.#2
+                .#..
+                ...1
+                """
+            ).strip()
+        ).grid()
+        pois = [grid.find(digit) for digit in "012"]
+        matrix = utils.poi_distance_matrix(grid, pois, passable=lambda v: v != "#")
+        assert matrix == [[0, 5, 7], [5, 0, 2], [7, 2, 0]]
+
+    def test_networkx(self):
+        import networkx as nx
+
+        graph = nx.Graph()
+        graph.add_edges_from([("a", "b"), ("b", "c"), ("a", "c")])
+        assert utils.poi_distance_matrix(graph, ["a", "c"]) == [[0, 1], [1, 0]]
+        graph["a"]["c"]["weight"] = 5
+        assert utils.poi_distance_matrix(graph, ["a", "c"]) == [[0, 2], [2, 0]]
+
+
+class TestContract:
+    data = dedent(
+        """
+        #S#####
+        #.....#
+        #.###.#
+        #.....#
+        ###.###
+        ###E###
+        """
+    ).strip()
+
+    def test_junctions(self):
+        grid = utils.Input(self.data).grid()
+        start, end = grid.find("S"), grid.find("E")
+        graph = grid.contract(lambda v: v != "#", keep=[start, end])
+        assert set(graph.nodes) == {start, (1, 1), (3, 3), end}
+        assert graph[start][(1, 1)]["weight"] == 1
+        assert graph[(3, 3)][end]["weight"] == 2
+        # Of the two corridors around the loop, the shorter is kept.
+        assert graph[(1, 1)][(3, 3)]["weight"] == 4
+        assert graph.number_of_edges() == 3
+
+    def test_longest_parallel(self):
+        grid = utils.Input(self.data).grid()
+        start, end = grid.find("S"), grid.find("E")
+        graph = grid.contract(lambda v: v != "#", keep=[start, end], parallel="longest")
+        assert graph[(1, 1)][(3, 3)]["weight"] == 8
+        assert len(graph[(1, 1)][(3, 3)]["cells"]) == 9
+        assert utils.longest_path(graph, start, end) == 11
+        with pytest.raises(ValueError):
+            grid.contract(lambda v: v != "#", parallel="widest")
+
+    def test_expand(self):
+        import networkx as nx
+
+        grid = utils.Input(self.data).grid()
+        start, end = grid.find("S"), grid.find("E")
+        graph = grid.contract(lambda v: v != "#", keep=[start, end])
+        nodes = nx.shortest_path(graph, start, end, weight="weight")
+        path = utils.expand_contracted_path(graph, nodes)
+        assert path[0] == start
+        assert path[-1] == end
+        assert len(path) == 8
+        assert all(utils.manhattan_2d(a, b) == 1 for a, b in itertools.pairwise(path))
+        assert utils.expand_contracted_path(graph, nodes[::-1]) == path[::-1]
+
+
+class TestLongestPath:
+    @staticmethod
+    def brute_force(graph, start, target):
+        best = -1
+        stack = [(start, {start}, 0)]
+        while stack:
+            node, seen, steps = stack.pop()
+            if node == target:
+                best = max(best, steps)
+                continue
+            for nb, data in graph[node].items():
+                if nb not in seen:
+                    stack.append((nb, seen | {nb}, steps + data["weight"]))
+        return best
+
+    @pytest.fixture
+    def graph(self):
+        import networkx as nx
+
+        graph = nx.Graph()
+        edges = [("s", "a", 2), ("s", "b", 7), ("a", "b", 3), ("a", "c", 4), ("b", "c", 1)]
+        edges += [("b", "d", 6), ("c", "d", 5), ("d", "e", 2), ("e", "t", 1)]
+        graph.add_weighted_edges_from(edges)
+        return graph
+
+    def test_longest(self, graph):
+        assert utils.longest_path(graph, "s", "t") == self.brute_force(graph, "s", "t") == 22
+
+    def test_processes(self, graph):
+        assert utils.longest_path(graph, "s", "t", processes=2) == 22
+
+    def test_unreachable(self, graph):
+        graph.add_node("x")
+        with pytest.raises(ValueError):
+            utils.longest_path(graph, "s", "x")
+
+
+class TestRayTable:
+    data = dedent(
+        """
+        ..#..
+        .....
+        #...#
+        ...#.
+        """
+    ).strip()
+
+    def test_jump(self):
+        grid = utils.Input(self.data).grid()
+        table = grid.ray_table("#")
+        assert table.jump((2, 2), utils.UP) == ((1, 2), True)
+        assert table.jump((2, 1), utils.UP) == ((0, 1), False)
+        assert table.jump((2, 2), utils.RIGHT) == ((2, 3), True)
+        assert table.jump((2, 2), utils.LEFT) == ((2, 1), True)
+        assert table.jump((1, 2), utils.UP) == ((1, 2), True)
+        assert table.jump((1, 3), utils.DOWN) == ((2, 3), True)
+        assert table.jump((3, 0), utils.RIGHT) == ((3, 2), True)
+        assert table.jump((3, 4), utils.RIGHT) == ((3, 4), False)
+
+    def test_extra(self):
+        grid = utils.Input(self.data).grid()
+        table = grid.ray_table("#")
+        assert table.jump((1, 0), utils.RIGHT, extra=(1, 3)) == ((1, 2), True)
+        assert table.jump((1, 0), utils.RIGHT, extra=(1, 1)) == ((1, 0), True)
+        # Behind, beside or beyond the stop, the extra blocker changes nothing.
+        assert table.jump((1, 2), utils.RIGHT, extra=(1, 0)) == ((1, 4), False)
+        assert table.jump((1, 0), utils.RIGHT, extra=(2, 2)) == ((1, 4), False)
+        assert table.jump((2, 1), utils.RIGHT, extra=(2, 4)) == ((2, 3), True)
+
+    def test_matches_stepping(self):
+        grid = utils.Input(self.data).grid()
+        table = grid.ray_table("#")
+        for point in grid.points:
+            if grid[point] == "#":
+                continue
+            for direction in utils.DIRECTIONS_4:
+                current = point
+                while (ahead := utils.point_add(current, direction)) in grid and grid[ahead] != "#":
+                    current = ahead
+                assert table.jump(point, direction) == (current, ahead in grid)
+
+
+class TestFirstDisconnect:
+    @staticmethod
+    def brute_force(grid, source, target, blocks):
+        for t in range(len(blocks)):
+            copy = utils.Grid(rows=list(grid.rows()))
+            for block in blocks[: t + 1]:
+                if block in copy:
+                    copy[block] = "#"
+            field = copy.distance_field([source], passable=lambda v: v != "#")
+            if copy[source] == "#" or target not in field:
+                return t
+        return None
+
+    @pytest.mark.parametrize("binary_search", [False, True])
+    def test_matches_brute_force(self, binary_search):
+        grid = utils.Input(".....\n.#...\n...#.\n.....").grid()
+        blocks = [(0, 2), (3, 2), (0, 2), (9, 9), (1, 2), (2, 2), (2, 1), (3, 4), (2, 0)]
+        expected = self.brute_force(grid, (0, 0), (3, 4), blocks)
+        assert expected == 4
+        first = grid.first_disconnect(
+            (0, 0), (3, 4), blocks, passable=lambda v: v != "#", binary_search=binary_search
+        )
+        assert first == expected
+
+    @pytest.mark.parametrize("binary_search", [False, True])
+    def test_edges(self, binary_search):
+        grid = utils.Input("...\n...").grid()
+        assert grid.first_disconnect((0, 0), (1, 2), [(0, 1)], binary_search=binary_search) is None
+        assert (
+            grid.first_disconnect((0, 0), (1, 2), [(0, 1), (1, 2)], binary_search=binary_search)
+            == 1
+        )
+        walled = utils.Input(".#.\n.#.").grid()
+        with pytest.raises(ValueError):
+            walled.first_disconnect(
+                (0, 0), (1, 2), [(0, 0)], passable=lambda v: v != "#", binary_search=binary_search
+            )
+
+
+class TestDisjointSet:
+    def test_union_find(self):
+        djs = utils.DisjointSet.from_iterable("abcdef")
+        assert djs.size() == 6
+        djs.union("a", "b")
+        djs.union("c", "d")
+        djs.union("b", "d")
+        assert djs.size() == 3
+        assert djs.connected("a", "c")
+        assert not djs.connected("a", "e")
+        assert djs.find("a") == djs.find("d")
+        assert sorted(map(sorted, djs.trees())) == [["a", "b", "c", "d"], ["e"], ["f"]]
+        with pytest.raises(ValueError):
+            djs.find("z")
+
+    def test_sizes(self):
+        djs = utils.DisjointSet.from_iterable(range(10))
+        for a, b in [(0, 1), (1, 2), (3, 4), (5, 6), (6, 7), (7, 8)]:
+            djs.union(a, b)
+        assert djs.component_size(0) == 3
+        assert djs.component_size(8) == 4
+        assert djs.component_size(9) == 1
+        assert djs.largest_sizes(3) == [4, 3, 2]
+
+    def test_from_forest(self):
+        djs = utils.DisjointSet({"a": {"a", "b"}, "c": {"c"}})
+        assert djs.size() == 2
+        assert djs.connected("a", "b")
+        assert djs.forest == {djs.find("a"): {"a", "b"}, "c": {"c"}}
+
+    def test_union_root(self):
+        djs = utils.DisjointSet.from_iterable("abcd")
+        assert djs.union("a", "b") == "b"
+        assert djs.union("c", "d") == "d"
+        assert djs.union("b", "d") == "d"
+        # The larger tree keeps its root, whichever side it's on.
+        djs.add("e")
+        assert djs.union("a", "e") == "d"
+
+    def test_repr_eq(self):
+        assert repr(utils.DisjointSet({"a": {"a"}})) == "DisjointSet(forest={'a': {'a'}})"
+        djs = utils.DisjointSet({"a": {"a", "b"}})
+        assert djs == utils.DisjointSet({"a": {"b", "a"}})
+        assert djs != utils.DisjointSet({"b": {"a", "b"}})
+
+
+class TestPriorityQueues:
+    @pytest.mark.parametrize(
+        "queue",
+        [utils.HeapQueue(), utils.BucketQueue(max_weight=3), utils.RadixHeap()],
+        ids=["heap", "bucket", "radix"],
+    )
+    def test_monotone_order(self, queue):
+        queue.push(0, "a")
+        queue.push(2, "c")
+        queue.push(1, "b")
+        assert len(queue) == 3
+        assert queue.pop() == (0, "a")
+        queue.push(3, "d")
+        queue.push(1, "e")
+        popped = [queue.pop() for _ in range(len(queue))]
+        assert [priority for priority, _ in popped] == [1, 1, 2, 3]
+        assert {item for _, item in popped} == {"b", "c", "d", "e"}
+        assert not queue
+        with pytest.raises(IndexError):
+            queue.pop()
+
+    def test_bucket_range(self):
+        queue = utils.BucketQueue(max_weight=2)
+        queue.push(10, "a")
+        queue.push(11, "b")
+        assert queue.pop() == (10, "a")
+        with pytest.raises(ValueError):
+            queue.push(13, "c")
+        with pytest.raises(ValueError):
+            queue.push(9, "c")
+
+    def test_radix_large_keys(self):
+        queue = utils.RadixHeap()
+        for priority in [5000, 1, 1001, 1000, 2**40]:
+            queue.push(priority, priority)
+        assert [queue.pop()[0] for _ in range(5)] == [1, 1000, 1001, 5000, 2**40]
+        with pytest.raises(ValueError):
+            queue.push(0, 0)
+
+    def test_search_with_queue(self):
+        grid = utils.Input("131\n952\n111").grid_int()
+
+        def successors(point):
+            return [(nb, grid[nb]) for nb in grid.get_neighbours(point)]
+
+        results = [
+            utils.dijkstra_search((0, 0), successors, queue=queue)
+            for queue in [None, utils.BucketQueue(max_weight=9), utils.RadixHeap()]
+        ]
+        assert results[0].distances == results[1].distances == results[2].distances
+        assert results[0].distances[(2, 2)] == 7
+
+    def test_best_score(self):
+        grid = utils.Input("..#\n.##\n...").grid()
+        best = utils.dijkstra_best_score(grid, (0, 0), (2, 2), unmovable="#")
+        assert best == utils.dijkstra_best_score(
+            grid, (0, 0), (2, 2), unmovable="#", queue=utils.HeapQueue()
+        )
+        assert best[(2, 2)] == 4
+        assert (0, 2) not in best
+
+
+class TestDijkstraSearch:
+    graph = {
+        "a": [("b", 1), ("c", 4)],
+        "b": [("c", 1), ("d", 5)],
+        "c": [("d", 1)],
+        "d": [],
+        "e": [("a", 1)],
+    }
+
+    def test_all_states(self):
+        result = utils.dijkstra_search("a", lambda s: self.graph[s])
+        assert result.distances == {"a": 0, "b": 1, "c": 2, "d": 3}
+        assert result.target is None
+        assert result.reconstruct_one("d") == ["a", "b", "c", "d"]
+        with pytest.raises(ValueError):
+            result.reconstruct_one("e")
+
+    def test_target(self):
+        result = utils.dijkstra_search("a", lambda s: self.graph[s], is_target=lambda s: s == "c")
+        assert result.target == "c"
+        assert result.distances[result.target] == 2
+        assert result.reconstruct_one() == ["a", "b", "c"]
+        assert "d" not in result.distances
+
+    def test_heuristic(self):
+        grid = utils.Input("....\n.##.\n....").grid()
+        end = (2, 3)
+
+        def successors(point):
+            return [(nb, 1) for nb in grid.get_neighbours(point) if grid[nb] == "."]
+
+        plain = utils.dijkstra_search((0, 0), successors, is_target=lambda p: p == end)
+        astar = utils.dijkstra_search(
+            (0, 0),
+            successors,
+            is_target=lambda p: p == end,
+            heuristic=lambda p: utils.manhattan_2d(p, end),
+        )
+        assert plain.distances[end] == astar.distances[end] == 5
+        assert len(astar.reconstruct_one()) == 6
+        assert len(astar.distances) <= len(plain.distances)
+
+    def test_all_shortest_paths(self):
+        grid = utils.Input("...\n.#.\n...").grid()
+
+        def successors(point):
+            return [(nb, 1) for nb in grid.get_neighbours(point) if grid[nb] == "."]
+
+        result = utils.dijkstra_search((0, 0), successors, is_target=lambda p: p == (2, 2))
+        assert sorted(result.predecessors[(2, 2)]) == [(1, 2), (2, 1)]
+        paths = sorted(result.reconstruct_all())
+        assert paths == [
+            [(0, 0), (0, 1), (0, 2), (1, 2), (2, 2)],
+            [(0, 0), (1, 0), (2, 0), (2, 1), (2, 2)],
+        ]
+        assert result.reconstruct_one() in paths
+        assert result.nodes_on_any_shortest_path() == set(grid.points) - {(1, 1)}
+        assert result.nodes_on_any_shortest_path((0, 2)) == {(0, 0), (0, 1), (0, 2)}
+
+    def test_shortest_path_on_grid(self):
+        grid = utils.Input("S.#\n..#\n#.E").grid()
+        path = utils.dijkstra_shortest_path(grid, (0, 0), (2, 2), unmovable="#")
+        assert path[0] == (0, 0)
+        assert path[-1] == (2, 2)
+        assert len(path) == 5
+
+
+class TestLazyImports:
+    LAZY = frozenset({"aocd", "networkx", "numpy", "parse", "rich", "rich_click"})
+    # utils takes ~12ms itself and ~50ms in all with a warm .pyc, or ~80ms and ~110ms when it has
+    # to be compiled. The budgets leave plenty of room for a slow machine.
+    SELF_BUDGET_US = 500_000
+    CUMULATIVE_BUDGET_US = 1_000_000
+
+    def cold_import(self) -> tuple[set[str], dict[str, tuple[int, int]]]:
+        """
+        Import utils in a fresh interpreter, as this one has already imported most of the lazy
+        modules for the tests. Returns the loaded modules, and each import's self and cumulative
+        time in microseconds.
+        """
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-c",
+                "import sys, utils; print(*sys.modules, sep='\\n')",
+            ],
+            cwd=pathlib.Path(utils.__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        loaded = {name.partition(".")[0] for name in result.stdout.splitlines()}
+        times = {}
+        for line in result.stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                own, total, name = line.removeprefix("import time:").split("|")
+                if total.strip().isdigit():
+                    times[name.strip()] = (int(own), int(total))
+        return loaded, times
+
+    def test_cold_import(self):
+        loaded, times = self.cold_import()
+        assert "utils" in times
+        assert not self.LAZY & loaded
+        assert not self.LAZY & {name.partition(".")[0] for name in times}
+
+    @pytest.mark.skipif(
+        "PYTEST_XDIST_WORKER" in os.environ, reason="timings are unreliable alongside other workers"
+    )
+    def test_import_time(self):
+        _, times = self.cold_import()
+        own, total = times["utils"]
+        assert own < self.SELF_BUDGET_US
+        assert total < self.CUMULATIVE_BUDGET_US
@@ -1,25 +1,43 @@
 from __future__ import annotations
 
-import contextlib
 import dataclasses
+import functools
+import heapq
 import itertools
 import math
-import multiprocessing
+import mmap
+import os
 import pathlib
 import re
-from collections import deque
-from collections.abc import Callable, Collection, Hashable, Iterable, Iterator, Sequence
+import sys
+from array import array
+from collections import deque, namedtuple
+from collections.abc import Callable, Collection, Hashable, Iterable, Iterator, Mapping, Sequence
 from contextlib import contextmanager
 from copy import deepcopy
 from enum import Enum, StrEnum
-from functools import cached_property
-from typing import Any, Generator, Self, TypedDict, TypeVar
-
-import aocd
-import networkx as nx
-import parse
-import rich_click as click
-from rich import live, panel
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ClassVar,
+    Generator,
+    Literal,
+    Protocol,
+    Self,
+    TypedDict,
+    TypeGuard,
+    TypeVar,
+    overload,
+)
+
+# aocd, networkx, parse, rich and rich_click take a few hundred milliseconds to import
+# between them, so they're imported where they're used rather than by every puzzle.
+if TYPE_CHECKING:
+    import networkx as nx
+    import numpy as np
+    import parse
+    from numpy.typing import NDArray
+    from rich import live, panel
 
 type Point = tuple[int, int]
 type Point3d = tuple[int, int, int]
@@ -53,14 +71,39 @@ class Input:
     def scan_ints(self) -> Sequence[int]:
         return scan_ints(self.data)
 
+    @overload
+    def ints_array(self, shape: None = None) -> array[int]: ...
+
+    @overload
+    def ints_array(self, shape: int | tuple[int, ...]) -> NDArray[np.int64]: ...
+
+    def ints_array(
+        self, shape: int | tuple[int, ...] | None = None
+    ) -> array[int] | NDArray[np.int64]:
+        """
+        Return every integer in the input in one pass, as an array('q').
+
+        With a shape, return a numpy int64 array of that shape instead (-1 is allowed, as
+        with numpy's reshape).
+
+        >>> Input("p=0,4 v=3,-3").ints_array(shape=(-1, 4))
+        array([[ 0,  4,  3, -3]])
+        """
+        ints = ints_array(self.data)
+        if shape is None:
+            return ints
+        import numpy as np
+
+        return np.frombuffer(ints, dtype=np.int64).reshape(shape).copy()
+
     @property
     def float(self) -> float:
         """Return the input data as a float"""
         return float(self.data)
 
-    def parse(self, parser: str) -> parse.Match | None:
-        """Parse the input data using the provided parser returning a Match or None"""
-        return parse.parse(parser, self.string)
+    def parse(self, parser: str) -> tuple[Any, ...] | None:
+        """Parse the input data using the provided parser returning a tuple, NamedTuple or None"""
+        return compile_pattern(parser).parse(self.string)
 
     def lines(self) -> InputList:
         """
@@ -78,7 +121,9 @@ class Input:
         """
         Split the input data into lines separated by the provided separator.
         """
-        return InputList(data=[Input(data=token) for token in self.data.split(sep)])
+        return InputList(
+            buffer=self.data, spans=split_spans(self.data, sep, 0, len(self.data), array("q"))
+        )
 
     def group(self, group: str | None = "\n\n", sep: str | None = None) -> InputGroup:
         """
@@ -99,16 +144,24 @@ class Input:
         """
         return self.split(group).split(sep)
 
-    def grid(self) -> Grid[str]:
+    def grid(self, dense: bool = False) -> Grid[str]:
         """
         Create a Grid from lines of input data.
+
+        If dense is True, a DenseGrid is returned instead.
         """
+        if dense:
+            return DenseGrid.from_string(self.data)
         return Grid.from_string(self.data)
 
-    def grid_int(self) -> Grid[int]:
+    def grid_int(self, dense: bool = False) -> Grid[int]:
         """
         Create a Grid of ints from lines of input data.
+
+        If dense is True, a DenseGrid is returned instead.
         """
+        if dense:
+            return DenseGrid.from_number_string(self.data)
         return Grid.from_number_string(self.data)
 
     def replace(self, old: str, new: str) -> Self:
@@ -116,7 +169,6 @@ class Input:
         return self
 
 
-@dataclasses.dataclass
 class InputList:
     """
     A list of strings.
@@ -125,23 +177,64 @@ class InputList:
 
     ["1", "2", "3"]
 
+    The strings are held as (start, end) spans into one shared buffer, and are only sliced
+    out (once) when strings, integers and the like are first used. The public properties
+    return new lists, so callers are free to mutate them.
     """
 
-    data: Sequence[Input]
+    def __init__(
+        self,
+        data: Iterable[Input] | None = None,
+        buffer: str = "",
+        spans: array[int] | None = None,
+    ) -> None:
+        if data is not None:
+            strings = [inp.string for inp in data]
+            buffer = "".join(strings)
+            spans = array("q")
+            end = 0
+            for string in strings:
+                spans.extend((end, end + len(string)))
+                end += len(string)
+        self.buffer = buffer
+        self.spans = spans if spans is not None else array("q")
+        self._strings: list[str] | None = None
+        self._integers: list[int] | None = None
+
+    def __repr__(self) -> str:
+        return f"InputList({self._cached_strings()!r})"
+
+    def __len__(self) -> int:
+        return len(self.spans) // 2
+
+    @property
+    def data(self) -> Sequence[Input]:
+        return [Input(data=string) for string in self._cached_strings()]
+
+    def _cached_strings(self) -> list[str]:
+        """
+        The strings sliced out of the buffer, cached for reuse within the class.
+        """
+        if self._strings is None:
+            buffer, spans = self.buffer, self.spans
+            self._strings = [buffer[spans[i] : spans[i + 1]] for i in range(0, len(spans), 2)]
+        return self._strings
 
     @property
     def strings(self) -> Sequence[str]:
         """
         Return a list of strings, one for each line.
         """
-        return [inp.string for inp in self.data]
+        return list(self._cached_strings())
 
     @property
     def integers(self) -> Sequence[int]:
         """
         Return a list of integers, one for each line.
         """
-        return [inp.integer for inp in self.data]
+        if self._integers is None:
+            self._integers = [int(string) for string in self._cached_strings()]
+        return list(self._integers)
 
     @property
     def numbers(self) -> Sequence[int]:
@@ -155,19 +248,45 @@ class InputList:
         """
         Return a list of floats, one for each line.
         """
-        return [inp.float for inp in self.data]
+        return [float(string) for string in self._cached_strings()]
+
+    def ints_matrix(self, columns: int | None = None) -> NDArray[np.int64]:
+        """
+        Return the integers of each line as a row of a numpy int64 matrix.
+
+        columns defaults to the number of integers in the first line, and every line must
+        have that many.
+        """
+        import numpy as np
+
+        ints = array("q")
+        for number, string in enumerate(self._cached_strings(), 1):
+            row = ints_array(string)
+            if columns is None:
+                columns = len(row)
+            if len(row) != columns:
+                raise ValueError(f"Expected {columns} integers on line {number}, got {len(row)}")
+            ints.extend(row)
+        return np.frombuffer(ints, dtype=np.int64).reshape(len(self), columns or 0).copy()
 
     def scan_ints(self) -> Sequence[Sequence[int]]:
-        return [inp.scan_ints() for inp in self.data]
+        buffer, spans = self.buffer, self.spans
+        return [
+            list(map(int, SCANNER.findall(buffer, spans[i], spans[i + 1])))
+            for i in range(0, len(spans), 2)
+        ]
 
-    def parse(self, *parsers: str) -> Sequence[parse.Match]:
+    def parse(self, *parsers: str) -> Sequence[tuple[Any, ...]]:
         """
         Return a list of parsed results, the first parser than matches each lines is used.
+
+        Results are tuples, or NamedTuples when every field is named. See compile_pattern.
         """
-        results: list[parse.Match] = []
-        for s in self.strings:
-            for p in parsers:
-                if result := parse.parse(p, s):
+        patterns = [compile_pattern(p) for p in parsers]
+        results: list[tuple[Any, ...]] = []
+        for s in self._cached_strings():
+            for pattern in patterns:
+                if (result := pattern.parse(s)) is not None:
                     results.append(result)
                     break
             else:
@@ -178,13 +297,18 @@ class InputList:
         """
         Return a group by splitting each line by the provided separator.
         """
-        return InputGroup(data=[inp.split(sep) for inp in self.data])
+        spans = array("q")
+        offsets = array("q", [0])
+        for i in range(0, len(self.spans), 2):
+            split_spans(self.buffer, sep, self.spans[i], self.spans[i + 1], spans)
+            offsets.append(len(spans) // 2)
+        return InputGroup(buffer=self.buffer, spans=spans, offsets=offsets)
 
-    def __iter__(self) -> Iterable[Input]:
-        return self.data.__iter__()
+    def __iter__(self) -> Iterator[Input]:
+        for string in self._cached_strings():
+            yield Input(data=string)
 
 
-@dataclasses.dataclass
 class InputGroup:
     """
     A list of lists.
@@ -195,9 +319,40 @@ class InputGroup:
         ["1", "2", "3"],
         ["4", "5", "6"],
     ]
+
+    Like InputList, every string is a span into one shared buffer. offsets[i] to
+    offsets[i + 1] are the spans making up the ith list.
     """
 
-    data: Sequence[InputList]
+    def __init__(
+        self,
+        data: Iterable[InputList] | None = None,
+        buffer: str = "",
+        spans: array[int] | None = None,
+        offsets: array[int] | None = None,
+    ) -> None:
+        self._data: list[InputList] | None = None
+        if data is not None:
+            self._data = list(data)
+        self.buffer = buffer
+        self.spans = spans if spans is not None else array("q")
+        self.offsets = offsets if offsets is not None else array("q", [0])
+
+    def __repr__(self) -> str:
+        return f"InputGroup({self.strings!r})"
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def data(self) -> Sequence[InputList]:
+        if self._data is None:
+            spans, offsets = self.spans, self.offsets
+            self._data = [
+                InputList(buffer=self.buffer, spans=spans[offsets[i] * 2 : offsets[i + 1] * 2])
+                for i in range(len(offsets) - 1)
+            ]
+        return self._data
 
     @property
     def strings(self) -> Sequence[Sequence[str]]:
@@ -230,7 +385,7 @@ class InputGroup:
     def scan_ints(self) -> Sequence[Sequence[Sequence[int]]]:
         return [inp.scan_ints() for inp in self.data]
 
-    def parse(self, *parsers: str) -> Sequence[Sequence[parse.Match]]:
+    def parse(self, *parsers: str) -> Sequence[Sequence[tuple[Any, ...]]]:
         """
         Parse the input data using the provided parsers for each line within the group.
         """
@@ -248,17 +403,158 @@ class InputGroup:
         """
         return Grid(rows=((int(item) for item in row) for group in self.strings for row in group))
 
-    def __iter__(self) -> Iterable[InputList]:
-        return self.data.__iter__()
+    def __iter__(self) -> Iterator[InputList]:
+        return iter(self.data)
 
 
 SCANNER = re.compile(r"-?[0-9]+")
+WORDS = re.compile(r"\S+")
+
+
+def split_spans(
+    buffer: str, sep: str | None, start: int, end: int, spans: array[int]
+) -> array[int]:
+    """
+    Append the (start, end) spans of buffer[start:end].split(sep) to spans, without slicing.
+    """
+    if sep is None:
+        for match in WORDS.finditer(buffer, start, end):
+            spans.extend(match.span())
+        return spans
+    if not sep:
+        raise ValueError("empty separator")
+    position = start
+    while (found := buffer.find(sep, position, end)) >= 0:
+        spans.extend((position, found))
+        position = found + len(sep)
+    spans.extend((position, end))
+    return spans
+
+
+PATTERN_FIELD = re.compile(r"\{\{|\}\}|\{([^{}]*)\}|[{}]")
+SIMPLE_FIELD = re.compile(r"([A-Za-z_]\w*)?(:d)?")
+PREFIXED_INT = re.compile(r"0[bBoOxX]")
+
+
+def parse_decimal(text: str) -> int:
+    """
+    Convert a decimal matched by parse's {:d}, where only the first character sets the sign.
+    """
+    return -int(text.lstrip("-+ ")) if text[0] == "-" else int(text.lstrip("-+ "))
+
+
+class Pattern:
+    """
+    A parse-style pattern, compiled once. Get one through compile_pattern, which caches them.
+
+    Patterns made only of {} and {:d} fields, or only of {name} and {name:d} fields, are
+    translated into a single regular expression. Other patterns fall back to parse.compile.
+    Either way a match comes back as a tuple, or a NamedTuple when the fields are named.
+
+    {:d} uses the same expression and sign handling as parse's decimals. parse also takes
+    0x, 0o and 0b numbers, which can change how a line splits, so for patterns with a {:d}
+    any string containing one of those prefixes is left to parse.
+    """
+
+    def __init__(self, pattern: str) -> None:
+        self.pattern = pattern
+        self.regex: re.Pattern[str] | None = None
+        self.converters: list[Callable[[str], Any] | None] = []
+        self.record: Callable[[Iterable[Any]], tuple[Any, ...]] | None = None
+        self.fallback: parse.Parser | None = None
+        self.integers = False
+        self._translate()
+
+    def _translate(self) -> None:
+        parts: list[str] = []
+        names: list[str | None] = []
+        position = 0
+        for match in PATTERN_FIELD.finditer(self.pattern):
+            parts.append(re.escape(self.pattern[position : match.start()]))
+            position = match.end()
+            token = match.group()
+            if token in ("{{", "}}"):
+                parts.append(re.escape(token[0]))
+                continue
+            if match.group(1) is None or (field := SIMPLE_FIELD.fullmatch(match.group(1))) is None:
+                break
+            name, integer = field.groups()
+            self.integers |= bool(integer)
+            names.append(name)
+            self.converters.append(parse_decimal if integer else None)
+            parts.append("([-+ ]?[-+ ]?[0-9]+)" if integer else "(.+?)")
+        else:
+            parts.append(re.escape(self.pattern[position:]))
+            named = [name for name in names if name is not None]
+            if not named or (len(named) == len(names) == len(set(named))):
+                # parse matches case insensitively, and lets . match newlines.
+                self.regex = re.compile("".join(parts), re.IGNORECASE | re.DOTALL)
+                if named:
+                    self.record = namedtuple("Parsed", named, rename=True)._make  # type: ignore [attr-defined]
+                return
+
+    def parse(self, string: str) -> tuple[Any, ...] | None:
+        """
+        Match the whole string, returning the converted fields or None.
+        """
+        if self.regex is None or (self.integers and PREFIXED_INT.search(string)):
+            return self._parse_fallback(string)
+        if (match := self.regex.fullmatch(string)) is None:
+            return None
+        values = tuple(
+            value if convert is None else convert(value)
+            for value, convert in zip(match.groups(), self.converters, strict=True)
+        )
+        return values if self.record is None else self.record(values)
+
+    def _parse_fallback(self, string: str) -> tuple[Any, ...] | None:
+        import parse
+
+        if self.fallback is None:
+            self.fallback = parse.compile(self.pattern)
+        if not isinstance(result := self.fallback.parse(string), parse.Result):
+            return None
+        if result.named and not result.fixed:
+            if self.record is None:
+                self.record = namedtuple("Parsed", result.named, rename=True)._make  # type: ignore [attr-defined]
+            return self.record(result.named.values())
+        return (*result.fixed, *result.named.values())
+
+
+@functools.cache
+def compile_pattern(pattern: str) -> Pattern:
+    """
+    Return the compiled Pattern for a parse-style pattern, compiling it on first use.
+
+    >>> compile_pattern("<x={x:d}, y={y:d}>").parse("<x=-1, y=2>")
+    Parsed(x=-1, y=2)
+    """
+    return Pattern(pattern)
 
 
 def scan_ints(data: str) -> Sequence[int]:
     return list(map(int, SCANNER.findall(data)))
 
 
+# Every byte that can't be part of a signed decimal becomes a space.
+INT_BYTES = bytes(c if chr(c) in "-0123456789" else 32 for c in range(256))
+
+
+def ints_array(data: str) -> array[int]:
+    """
+    Return every integer in data as an array('q'), the same as scan_ints.
+
+    The fast path maps all other characters to spaces with one bytes.translate and lets
+    int() parse the tokens, only falling back to the SCANNER regex for stray dashes
+    (like 1-2 or a lone -).
+    """
+    tokens = data.encode().translate(INT_BYTES).split()
+    try:
+        return array("q", map(int, tokens))
+    except ValueError:
+        return array("q", map(int, SCANNER.findall(data)))
+
+
 def int_numbers(input_data: str, sep: str | None = None) -> Sequence[int]:
     """Transform a line of numbers into a list of integers"""
     if sep is None:
@@ -719,39 +1015,246 @@ def num_sides_of_group(group: set[Point]) -> int:
     return len(all_corners(group))
 
 
+def neighbour_sum(array: NDArray[Any], diagonal: bool = False) -> NDArray[np.int64]:
+    """
+    Sum the 4 (or 8 if diagonal) neighbours of every cell in a 2d array.
+
+    Cells outside of the array count as 0. Pass a boolean mask to count matching neighbours.
+
+    >>> neighbour_sum(np.array([[1, 1], [0, 1]]), diagonal=True)
+    array([[2, 2], [3, 2]])
+    """
+    import numpy as np
+
+    height, width = array.shape
+    padded = np.pad(array.astype(np.int64), 1)
+    total = np.zeros((height, width), dtype=np.int64)
+    for dr, dc in DIRECTIONS_8 if diagonal else DIRECTIONS_4:
+        total += padded[1 + dr : 1 + dr + height, 1 + dc : 1 + dc + width]
+    return total
+
+
+def mask_points(mask: NDArray[np.bool_]) -> list[Point]:
+    """
+    Return the (row, column) points that are True in a 2d mask, in row-major order.
+    """
+    import numpy as np
+
+    return [(r, c) for r, c in np.argwhere(mask).tolist()]
+
+
+def radius_offsets(radius: int, diagonal: bool = False) -> list[tuple[Point, int]]:
+    """
+    Return the (offset, distance) pairs within radius of a point, excluding the point.
+
+    The offsets form a diamond (manhattan distance), or a square (chebyshev distance) when
+    diagonal. Only half of them are returned, those after (0, 0) in row-major order, so
+    pairing each point with its offsets visits every unordered pair once.
+
+    >>> radius_offsets(1)
+    [((0, 1), 1), ((1, 0), 1)]
+    """
+    offsets = []
+    for dr in range(radius + 1):
+        span = radius if diagonal else radius - dr
+        for dc in range(-span if dr else 1, span + 1):
+            offsets.append(((dr, dc), max(dr, abs(dc)) if diagonal else dr + abs(dc)))
+    return offsets
+
+
+def pairs_within(
+    points: Collection[Point], radius: int, diagonal: bool = False, batch_size: int = 4096
+) -> Iterator[list[tuple[Point, Point, int]]]:
+    """
+    Find every pair of points within radius of each other, yielding them in batches.
+
+    Each point is only compared with the O(radius ** 2) offsets around it, rather than
+    with every other point. Pairs are (point, other, distance), with each pair once.
+
+    >>> for batch in pairs_within(track, 20):
+    ...     for a, b, distance in batch:
+    """
+    members = points if isinstance(points, (set, frozenset, dict)) else set(points)
+    offsets = radius_offsets(radius, diagonal)
+    batch: list[tuple[Point, Point, int]] = []
+    for r, c in points:
+        for (dr, dc), distance in offsets:
+            if (other := (r + dr, c + dc)) in members:
+                batch.append(((r, c), other, distance))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def count_pairs_within(
+    values: NDArray[np.int64], radius: int, threshold: int, diagonal: bool = False
+) -> int:
+    """
+    Count the pairs of cells within radius whose values differ by at least distance + threshold.
+
+    values is a 2d array where negative values mark cells to skip, such as an array of
+    distances along a track, where the count is the number of shortcuts saving at least
+    threshold. Each offset is one whole-array comparison, so the work is vectorised.
+    """
+    import numpy as np
+
+    height, width = values.shape
+    total = 0
+    for (dr, dc), distance in radius_offsets(radius, diagonal):
+        r0, r1 = max(0, -dr), height - max(0, dr)
+        c0, c1 = max(0, -dc), width - max(0, dc)
+        if r0 >= r1 or c0 >= c1:
+            continue
+        a = values[r0:r1, c0:c1]
+        b = values[r0 + dr : r1 + dr, c0 + dc : c1 + dc]
+        saving = np.abs(a - b) - distance
+        total += int(np.count_nonzero((a >= 0) & (b >= 0) & (saving >= threshold)))
+    return total
+
+
+class PriorityQueue[T](Protocol):
+    """
+    A min priority queue of items keyed by integer priorities, as used by the searches.
+    """
+
+    def push(self, priority: int, item: T) -> None: ...
+
+    def pop(self) -> tuple[int, T]: ...
+
+    def __len__(self) -> int: ...
+
+
+class HeapQueue[T]:
+    """
+    A binary heap priority queue, for any priorities.
+
+    Ties pop in insertion order, so items never need to be comparable.
+    """
+
+    def __init__(self) -> None:
+        self.heap: list[tuple[int, int, T]] = []
+        self.counter = itertools.count()
+
+    def push(self, priority: int, item: T) -> None:
+        heapq.heappush(self.heap, (priority, next(self.counter), item))
+
+    def pop(self) -> tuple[int, T]:
+        priority, _, item = heapq.heappop(self.heap)
+        return priority, item
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+
+class BucketQueue[T]:
+    """
+    Dial's bucket queue, for searches with small non-negative integer edge weights.
+
+    Every queued priority lies within max_weight of the last one popped (or the first one
+    pushed), so a circular array of max_weight + 1 buckets indexed by priority mod the span
+    holds them all. Push is O(1) and pop is amortised O(1), with no tuple comparisons. With
+    A*, size max_weight to the largest rise in cost + heuristic over a single step.
+
+    >>> queue = BucketQueue(max_weight=9)
+    """
+
+    def __init__(self, max_weight: int) -> None:
+        self.span = max_weight + 1
+        self.buckets: list[list[T]] = [[] for _ in range(self.span)]
+        self.current = 0
+        self.started = False
+        self.size = 0
+
+    def push(self, priority: int, item: T) -> None:
+        if not self.started:
+            self.current = priority
+            self.started = True
+        if not self.current <= priority < self.current + self.span:
+            raise ValueError(
+                f"Priority {priority} is outside {self.current}..{self.current + self.span - 1}"
+            )
+        self.buckets[priority % self.span].append(item)
+        self.size += 1
+
+    def pop(self) -> tuple[int, T]:
+        if not self.size:
+            raise IndexError("pop from an empty BucketQueue")
+        while not self.buckets[self.current % self.span]:
+            self.current += 1
+        self.size -= 1
+        return self.current, self.buckets[self.current % self.span].pop()
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class RadixHeap[T]:
+    """
+    A radix heap, for monotone priorities that are too far apart for a BucketQueue.
+
+    Items are bucketed by the highest bit in which their priority differs from the last
+    one popped, so each item moves between buckets at most 64 times. Priorities must be
+    below 2 ** 64 and never drop below the last one popped.
+    """
+
+    def __init__(self) -> None:
+        self.last = 0
+        self.buckets: list[list[tuple[int, T]]] = [[] for _ in range(65)]
+        self.size = 0
+
+    def push(self, priority: int, item: T) -> None:
+        if priority < self.last:
+            raise ValueError(f"Priority {priority} is below the last popped {self.last}")
+        self.buckets[(priority ^ self.last).bit_length()].append((priority, item))
+        self.size += 1
+
+    def pop(self) -> tuple[int, T]:
+        if not self.size:
+            raise IndexError("pop from an empty RadixHeap")
+        if not self.buckets[0]:
+            index = next(i for i, bucket in enumerate(self.buckets) if bucket)
+            bucket, self.buckets[index] = self.buckets[index], []
+            self.last = min(priority for priority, _ in bucket)
+            for priority, item in bucket:
+                self.buckets[(priority ^ self.last).bit_length()].append((priority, item))
+        self.size -= 1
+        return self.buckets[0].pop()
+
+    def __len__(self) -> int:
+        return self.size
+
+
 def dijkstra_best_score[T](
     grid: Grid[T],
     start: Point,
     target: Point,
     direction: Point = UP,
     unmovable: T | None = None,
+    queue: PriorityQueue[Point] | None = None,
 ) -> dict[Point, int]:
     """
     Find the best score to reach the target from the start.
 
-    Returns a dictionary of the best score to reach each point from the start.
+    Returns a dictionary of the best score to reach each point from the start. Every step
+    costs 1, so the frontier is a BucketQueue unless another queue is given.
     """
-    import heapq
-
-    type Steps = int
-    type Current = Point
-
-    heap: list[tuple[Steps, Current]] = []
-    # add whatever other vars I might need to track like the Path
-    heapq.heappush(heap, (0, start))
-    seen: dict[Point, Steps] = {}
-    while heap:
-        num_steps, position = heapq.heappop(heap)
-        if position == target:
-            seen[position] = min(seen.get(position, int(1e9)), num_steps)
+    frontier: PriorityQueue[Point] = queue if queue is not None else BucketQueue(max_weight=1)
+    frontier.push(0, start)
+    seen: dict[Point, int] = {}
+    while frontier:
+        num_steps, position = frontier.pop()
+        if position in seen:
             continue
-        if grid[position] == unmovable:
-            continue
-        if position in seen and seen[position] <= num_steps:
+        if position != target and grid[position] == unmovable:
             continue
         seen[position] = num_steps
+        if position == target:
+            continue
         for new_position in grid.get_neighbours(position):
-            heapq.heappush(heap, (num_steps + 1, new_position))
+            if new_position not in seen:
+                frontier.push(num_steps + 1, new_position)
     return seen
 
 
@@ -765,32 +1268,342 @@ def dijkstra_shortest_path[T](
     """
     Find the shortest path between START and TARGET.
     """
-    import heapq
 
-    type Steps = int
-    type Current = Point
-    type Path = list[Point]
+    def successors(position: Point) -> Iterable[tuple[Point, int]]:
+        if grid[position] == unmovable:
+            return ()
+        return ((neighbour, 1) for neighbour in grid.get_neighbours(position))
 
-    heap: list[tuple[Steps, Current, Path]] = []
-    # add whatever other vars I might need to track like the Path
-    heapq.heappush(heap, (0, start, []))
-    seen: dict[Point, tuple[Steps, Path]] = {}
-    while heap:
-        num_steps, position, path = heapq.heappop(heap)
-        path.append(position)
-        if position == target:
-            s_steps, _ = seen.get(position, (int(1e9), []))
-            if num_steps <= s_steps:
-                seen[position] = (num_steps, path)
+    result = dijkstra_search(start, successors, is_target=lambda position: position == target)
+    return result.reconstruct_one(target)
+
+
+@dataclasses.dataclass
+class SearchResult[S]:
+    """
+    The outcome of a dijkstra_search.
+
+    distances holds the lowest cost to each settled state, and predecessors every state it
+    can be reached from at that cost, making a DAG of all the shortest paths. target is the
+    state that ended the search early, if any.
+    """
+
+    start: S
+    distances: dict[S, int]
+    predecessors: dict[S, list[S]]
+    target: S | None = None
+
+    def _resolve(self, state: S | None) -> S:
+        if state is None:
+            if self.target is None:
+                raise ValueError("No target was reached")
+            state = self.target
+        if state not in self.distances:
+            raise ValueError(f"{state} was not reached")
+        return state
+
+    def reconstruct_one(self, state: S | None = None) -> list[S]:
+        """
+        Return one shortest path of states from start to state (or the target).
+        """
+        state = self._resolve(state)
+        path = [state]
+        while state != self.start:
+            state = self.predecessors[state][0]
+            path.append(state)
+        return path[::-1]
+
+    def reconstruct_all(self, state: S | None = None) -> Iterator[list[S]]:
+        """
+        Yield every shortest path of states from start to state (or the target).
+
+        There can be exponentially many, so prefer nodes_on_any_shortest_path for counting.
+        """
+        state = self._resolve(state)
+        stack: list[tuple[S, list[S]]] = [(state, [state])]
+        while stack:
+            current, path = stack.pop()
+            if current == self.start:
+                yield path[::-1]
+                continue
+            for previous in self.predecessors[current]:
+                stack.append((previous, [*path, previous]))
+
+    def nodes_on_any_shortest_path(self, *states: S) -> set[S]:
+        """
+        Return the states that lie on any shortest path from start to the given states.
+
+        Defaults to the target. Pass several states that share the best cost (like every
+        direction of arrival at an end point) to union their paths.
+        """
+        pending = [self._resolve(state) for state in states or (None,)]
+        seen = set(pending)
+        while pending:
+            for previous in self.predecessors.get(pending.pop(), ()):
+                if previous not in seen:
+                    seen.add(previous)
+                    pending.append(previous)
+        return seen
+
+
+def dijkstra_search[S: Hashable](
+    start: S,
+    successors: Callable[[S], Iterable[tuple[S, int]]],
+    is_target: Callable[[S], bool] | None = None,
+    heuristic: Callable[[S], int] | None = None,
+    queue: PriorityQueue[int] | None = None,
+) -> SearchResult[S]:
+    """
+    Find the lowest cost to reach states from start, for any kind of state.
+
+    successors yields (next state, cost) pairs for a state. The search stops at the first
+    state matching is_target, otherwise every reachable state is settled. A consistent
+    heuristic turns this into A*: h(state) must never exceed cost + h(next) for any step,
+    as settled states are never reopened. Being admissible alone is not enough.
+
+    States are interned to integer ids, so the queue only holds small ints. It is a
+    HeapQueue unless another is given, such as a BucketQueue for small edge weights. Only
+    predecessors are recorded (every one reaching a state at its best cost), and paths are
+    rebuilt from them on demand.
+
+    >>> result = dijkstra_search((start, RIGHT), successors, lambda s: s[0] == end)
+    >>> result.distances[result.target]
+    """
+    h = heuristic or (lambda _: 0)
+    ids: dict[S, int] = {start: 0}
+    states = [start]
+    costs = [0]
+    previous: list[list[int]] = [[]]
+    settled = bytearray(1)
+    frontier: PriorityQueue[int] = queue if queue is not None else HeapQueue()
+    frontier.push(h(start), 0)
+    target: S | None = None
+    while frontier:
+        _, sid = frontier.pop()
+        if settled[sid]:
             continue
-        if grid[position] == unmovable:
+        settled[sid] = 1
+        cost = costs[sid]
+        state = states[sid]
+        if is_target is not None and is_target(state):
+            target = state
+            break
+        for next_state, step in successors(state):
+            next_cost = cost + step
+            if (nid := ids.get(next_state)) is None:
+                nid = ids[next_state] = len(states)
+                states.append(next_state)
+                costs.append(next_cost)
+                previous.append([sid])
+                settled.append(0)
+            elif settled[nid] or next_cost > costs[nid]:
+                continue
+            elif next_cost == costs[nid]:
+                # Another way in at the same cost, already queued
+                previous[nid].append(sid)
+                continue
+            else:
+                costs[nid] = next_cost
+                previous[nid] = [sid]
+            frontier.push(next_cost + h(next_state), nid)
+
+    return SearchResult(
+        start=start,
+        distances={states[i]: costs[i] for i in range(len(states)) if settled[i]},
+        predecessors={
+            states[i]: [states[p] for p in previous[i]] for i in range(1, len(states)) if settled[i]
+        },
+        target=target,
+    )
+
+
+def _is_graph(obj: object) -> TypeGuard[nx.Graph[Any]]:
+    """
+    Check for a networkx graph without importing networkx, as a graph means it's loaded.
+    """
+    networkx = sys.modules.get("networkx")
+    return networkx is not None and isinstance(obj, networkx.Graph)
+
+
+def poi_distance_matrix(
+    graph_or_grid: Grid[Any] | nx.Graph[Any] | Mapping[Any, Iterable[Any]],
+    pois: Sequence[Any],
+    passable: Callable[[Any], bool] | None = None,
+    weight: str = "weight",
+) -> list[list[int]]:
+    """
+    Find the distance between every pair of points of interest.
+
+    matrix[i][j] is the distance from pois[i] to pois[j], or -1 if it can't be reached,
+    ready for bitmask DP or travelling salesman style searches over the indices.
+
+    graph_or_grid can be a Grid (only entering cells whose value is passable), a networkx
+    graph or a mapping of node to neighbours. There is one breadth first search per poi,
+    stopping once every other poi is found. networkx graphs with weighted edges fall back
+    to a dijkstra_search per poi.
+
+    >>> matrix = poi_distance_matrix(tunnels, ["AA", *useful])
+    """
+    index = {poi: i for i, poi in enumerate(pois)}
+    matrix = [[-1] * len(pois) for _ in pois]
+    neighbours: Callable[[Any], Iterable[Any]]
+    if isinstance(graph_or_grid, Grid):
+        grid = graph_or_grid
+
+        def neighbours(point: Point) -> Iterable[Point]:
+            return (
+                nb for nb in grid.get_neighbours(point) if passable is None or passable(grid[nb])
+            )
+
+    elif _is_graph(graph_or_grid):
+        graph = graph_or_grid
+        if any(weight in data for _, _, data in graph.edges(data=True)):
+
+            def successors(node: Any) -> Iterable[tuple[Any, int]]:
+                return ((nb, data.get(weight, 1)) for nb, data in graph[node].items())
+
+            for i, poi in enumerate(pois):
+                distances = dijkstra_search(poi, successors).distances
+                matrix[i] = [distances.get(other, -1) for other in pois]
+            return matrix
+        neighbours = graph.neighbors
+    else:
+        neighbours = graph_or_grid.__getitem__
+
+    for i, poi in enumerate(pois):
+        row = matrix[i]
+        row[i] = 0
+        remaining = len(index) - 1
+        seen = {poi}
+        frontier = [poi]
+        distance = 0
+        while frontier and remaining:
+            distance += 1
+            next_frontier = []
+            for node in frontier:
+                for nb in neighbours(node):
+                    if nb in seen:
+                        continue
+                    seen.add(nb)
+                    next_frontier.append(nb)
+                    if (j := index.get(nb)) is not None:
+                        row[j] = distance
+                        remaining -= 1
+            frontier = next_frontier
+    return matrix
+
+
+def expand_contracted_path(graph: nx.Graph[Point], nodes: Sequence[Point]) -> list[Point]:
+    """
+    Expand a route through a graph from Grid.contract back into every grid cell it crosses.
+    """
+    path = list(nodes[:1])
+    for u, v in itertools.pairwise(nodes):
+        cells = graph[u][v]["cells"]
+        path.extend(cells[1:] if cells[0] == u else cells[-2::-1])
+    return path
+
+
+type _LongestPathState = tuple[int, int, int, int]
+
+
+def _longest_path_dfs(
+    adjacency: list[list[tuple[int, int]]],
+    max_in: list[int],
+    target: int,
+    stack: list[_LongestPathState],
+    best: int = -1,
+) -> int:
+    """
+    Depth first search for longest_path over (node, visited mask, steps, bound) states.
+
+    Only paths longer than best are looked for.
+    """
+    while stack:
+        node, visited, steps, remaining = stack.pop()
+        if node == target:
+            best = max(best, steps)
             continue
-        if position in seen and seen[position][0] <= num_steps:
+        if steps + remaining <= best:
             continue
-        seen[position] = num_steps, path
-        for new_position in grid.get_neighbours(position):
-            heapq.heappush(heap, (num_steps + 1, new_position, path[:]))
-    return seen[target][1]
+        for nb, weight in adjacency[node]:
+            if not visited >> nb & 1:
+                stack.append((nb, visited | 1 << nb, steps + weight, remaining - max_in[nb]))
+    return best
+
+
+def _longest_path_worker(
+    args: tuple[list[list[tuple[int, int]]], list[int], int, _LongestPathState, int],
+) -> int:
+    adjacency, max_in, target, state, best = args
+    return _longest_path_dfs(adjacency, max_in, target, [state], best)
+
+
+def longest_path[N: Hashable](
+    graph: nx.Graph[N], start: N, target: N, weight: str = "weight", processes: int = 1
+) -> int:
+    """
+    Find the length of the longest simple path from start to target.
+
+    This is exponential, so it is meant for small graphs such as those from Grid.contract.
+    Nodes are bits in an int mask of visited nodes, and a branch is dropped once its steps
+    plus the best edge into each unvisited node can't beat the best found. If the target
+    has a single neighbour, reaching that neighbour must lead straight to the target.
+
+    With processes > 1 the first few levels are expanded up front and the branches are
+    shared across a multiprocessing pool. The workers can't share what they find, so each
+    starts from the length of a greedy heaviest-edge-first walk.
+    """
+    ids = {node: i for i, node in enumerate(graph.nodes)}
+    adjacency: list[list[tuple[int, int]]] = [[] for _ in ids]
+    max_in = [0] * len(ids)
+    for node, i in ids.items():
+        for neighbour, data in graph[node].items():
+            j = ids[neighbour]
+            adjacency[i].append((j, data.get(weight, 1)))
+            max_in[j] = max(max_in[j], data.get(weight, 1))
+    for edges in adjacency:
+        # The stack pops the heaviest edge first, which finds long paths (and so prunes) early.
+        edges.sort(key=lambda edge: edge[1])
+    source, goal = ids[start], ids[target]
+    into_goal = [i for i, edges in enumerate(adjacency) if any(nb == goal for nb, _ in edges)]
+    if len(into_goal) == 1:
+        funnel = into_goal[0]
+        adjacency[funnel] = [(nb, w) for nb, w in adjacency[funnel] if nb == goal]
+
+    states: list[_LongestPathState] = [(source, 1 << source, 0, sum(max_in) - max_in[source])]
+    if processes > 1:
+        import multiprocessing
+
+        best = -1
+        current, visited, steps = source, 1 << source, 0
+        while current != goal and (
+            options := [(w, nb) for nb, w in adjacency[current] if not visited >> nb & 1]
+        ):
+            w, current = max(options)
+            visited |= 1 << current
+            steps += w
+        if current == goal:
+            best = steps
+        # Expand breadth first until there are enough branches to keep the pool busy.
+        while states and len(states) < processes * 8:
+            expanded: list[_LongestPathState] = []
+            for position, visited, steps, remaining in states:
+                if position == goal:
+                    best = max(best, steps)
+                    continue
+                for nb, w in adjacency[position]:
+                    if not visited >> nb & 1:
+                        expanded.append((nb, visited | 1 << nb, steps + w, remaining - max_in[nb]))
+            states = expanded
+        with multiprocessing.Pool(processes) as pool:
+            tasks = [(adjacency, max_in, goal, state, best) for state in states]
+            best = max([best, *pool.imap_unordered(_longest_path_worker, tasks)])
+    else:
+        best = _longest_path_dfs(adjacency, max_in, goal, states)
+    if best < 0:
+        raise ValueError(f"No path from {start} to {target}")
+    return best
 
 
 def line_overlaps(l1: Point, l2: Point) -> bool:
@@ -828,74 +1641,429 @@ type Tree[H] = set[H]
 type Forest[H] = dict[H, Tree[H]]
 
 
-@dataclasses.dataclass()
 class DisjointSet[H]:
     """
     DisjointSet allows for Union-Find to connect sets together.
-    """
 
-    forest: dict[H, set[H]]
+    Nodes are mapped to dense ids backed by parent and size lists, using path compression and
+    union by size, so find and union are close to O(1).
+    """
 
-    def __init__(self, forest: Forest[H]) -> None:
-        self.forest = forest
+    def __init__(self, forest: Forest[H] | None = None) -> None:
+        self.nodes: list[H] = []
+        self.ids: dict[H, int] = {}
+        self.parent: list[int] = []
+        self.sizes: list[int] = []
+        self.num_trees = 0
+        for root, tree in (forest or {}).items():
+            self.add(root)
+            for node in tree:
+                self.add(node)
+                self.union(node, root)
 
     @classmethod
-    def from_iterable(cls, nodes: Sequence[H]) -> DisjointSet[H]:
-        return DisjointSet({n: {n} for n in nodes})
+    def from_iterable(cls, nodes: Iterable[H]) -> DisjointSet[H]:
+        djs: DisjointSet[H] = DisjointSet()
+        for node in nodes:
+            djs.add(node)
+        return djs
+
+    def add(self, node: H) -> None:
+        """
+        Add a node as its own tree, if it's not already in the forest.
+        """
+        if node in self.ids:
+            return
+        self.ids[node] = len(self.nodes)
+        self.parent.append(len(self.nodes))
+        self.sizes.append(1)
+        self.nodes.append(node)
+        self.num_trees += 1
+
+    def _root(self, node: H) -> int:
+        if (idx := self.ids.get(node)) is None:
+            raise ValueError("Not in forest")
+        parent = self.parent
+        root = idx
+        while parent[root] != root:
+            root = parent[root]
+        while parent[idx] != root:
+            parent[idx], idx = root, parent[idx]
+        return root
 
     def find(self, node: H) -> H:
-        for parent in self.forest:
-            if node in self.forest[parent]:
-                return parent
-        raise ValueError("Not in forest")
+        return self.nodes[self._root(node)]
 
     def union(self, from_node: H, to_node: H) -> H:
-        from_parent = self.find(from_node)
-        to_parent = self.find(to_node)
-        if from_parent != to_parent:
-            self.forest[to_parent] |= self.forest[from_parent]
-            del self.forest[from_parent]
-        return to_parent
+        """
+        Join the trees of both nodes, returning the root of the joined tree.
+
+        The smaller tree is attached under the larger one, so the root is only guaranteed to be
+        to_node's root when its tree is at least as large as from_node's.
+        """
+        from_root = self._root(from_node)
+        to_root = self._root(to_node)
+        if from_root != to_root:
+            if self.sizes[from_root] > self.sizes[to_root]:
+                from_root, to_root = to_root, from_root
+            self.parent[from_root] = to_root
+            self.sizes[to_root] += self.sizes[from_root]
+            self.num_trees -= 1
+        return self.nodes[to_root]
 
     def size(self) -> int:
-        return len(self.forest)
+        """
+        The number of trees in the forest.
+        """
+        return self.num_trees
+
+    def component_size(self, node: H) -> int:
+        """
+        The number of nodes in the same tree as node.
+        """
+        return self.sizes[self._root(node)]
+
+    def largest_sizes(self, k: int) -> list[int]:
+        """
+        The sizes of the k largest trees, largest first.
+        """
+        sizes = self.sizes
+        return heapq.nlargest(k, (sizes[i] for i, p in enumerate(self.parent) if i == p))
 
     def trees(self) -> Sequence[set[H]]:
         return list(self.forest.values())
 
+    @property
+    def forest(self) -> Forest[H]:
+        """
+        Each tree keyed by its root node.
+        """
+        forest: Forest[H] = {}
+        for node in self.nodes:
+            forest.setdefault(self.find(node), set()).add(node)
+        return forest
+
     def connected(self, from_node: H, to_node: H) -> bool:
-        return self.find(from_node) == self.find(to_node)
+        return self._root(from_node) == self._root(to_node)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(forest={self.forest!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DisjointSet):
+            return NotImplemented
+        return self.forest == other.forest
 
 
 @dataclasses.dataclass
-class Grid[T]:
+class Component:
     """
-    Models a grid of (row, column) points with a value at each point.
+    A connected region of a grid, as found by Grid.label_components.
+
+    bounds is (min row, max row, min column, max column), the same as Grid.bounds.
     """
 
-    points: dict[Point, T]
-    _drawer: GridDrawer
-    _animating: bool = False
+    label: int
+    value: Hashable
+    bounds: tuple[int, int, int, int]
+    area: int = 0
+    perimeter: int = 0
+    corners: int = 0
+    points: list[Point] = dataclasses.field(default_factory=list)
 
-    def __init__(self, rows: Iterable[Iterable[T]], pad_with: T | None = None):
-        self.points = {}
-        self.pad_with = pad_with
-        for r, row in enumerate(rows):
-            for c, item in enumerate(row):
-                self.points[(r, c)] = item
-        self._animating = False
-        self._drawer = GridDrawer(frames=[])
 
-    @classmethod
-    def from_number_string(
-        cls, data: str, separator: str | None = None, pad_with: int | None = None
-    ) -> Grid[int]:
+@dataclasses.dataclass
+class DistanceField:
+    """
+    Steps from the nearest source to each cell, as found by Grid.distance_field.
+
+    distances is a flat array in row-major order over the grid's bounds, with -1 for cells
+    that were not reached. level_sizes counts the cells reached at each distance, so the
+    reachable queries never walk the grid again.
+    """
+
+    distances: array[int]
+    origin: Point
+    width: int
+    level_sizes: list[int]
+
+    def _index(self, point: Point) -> int | None:
+        r, c = point[0] - self.origin[0], point[1] - self.origin[1]
+        if 0 <= c < self.width and 0 <= (index := r * self.width + c) < len(self.distances):
+            return index
+        return None
+
+    def get(self, point: Point, default: int | None = None) -> int | None:
+        index = self._index(point)
+        if index is None or (distance := self.distances[index]) < 0:
+            return default
+        return distance
+
+    def __getitem__(self, point: Point) -> int:
+        if (distance := self.get(point)) is None:
+            raise KeyError(point)
+        return distance
+
+    def __contains__(self, point: Point) -> bool:
+        return self.get(point) is not None
+
+    def __len__(self) -> int:
+        return sum(self.level_sizes)
+
+    def items(self) -> Iterator[tuple[Point, int]]:
         """
-        Build a grid from a string of numbers, each row separated by a newline.
+        Iterate over the (point, distance) pairs of reached cells in row-major order.
         """
-        if separator:
-            return Grid(
-                rows=((int(n) for n in row.split(separator)) for row in data.splitlines()),
+        row, col = self.origin
+        for index, distance in enumerate(self.distances):
+            if distance >= 0:
+                yield (row + index // self.width, col + index % self.width), distance
+
+    def as_array(self) -> NDArray[np.int64]:
+        """
+        Return the distances as a 2d numpy array over the grid's bounds, with -1 if unreached.
+        """
+        import numpy as np
+
+        return np.array(self.distances, dtype=np.int64).reshape(-1, self.width)
+
+    @property
+    def max_distance(self) -> int:
+        return len(self.level_sizes) - 1
+
+    def reachable(self, max_steps: int | None = None, parity: int | None = None) -> int:
+        """
+        Count the cells within max_steps of a source.
+
+        With a parity, only count cells whose distance has that parity (0 even, 1 odd),
+        which are the cells that can be stood on after exactly max_steps when stepping back
+        and forth is allowed.
+        """
+        sizes = self.level_sizes if max_steps is None else self.level_sizes[: max_steps + 1]
+        if parity is None:
+            return sum(sizes)
+        return sum(sizes[parity % 2 :: 2])
+
+
+class RayTable:
+    """
+    Where a straight walk from each cell stops, as built by Grid.ray_table.
+
+    For every cell and each of DIRECTIONS_4 the table holds the last free cell before the
+    next blocker, or the last cell before leaving the grid. A walk can then jump from
+    segment to segment rather than stepping cell by cell.
+    """
+
+    def __init__(self, grid: Grid[Any], blocker: Any) -> None:
+        min_row, max_row, min_col, max_col = grid.bounds
+        self.origin = (min_row, min_col)
+        self.width = max_col - min_col + 1
+        height = max_row - min_row + 1
+        # stops[index * 4 + k] is the index of the stop in DIRECTIONS_4[k], or ~index when
+        # the walk leaves the grid rather than meeting a blocker.
+        self.stops = array("q", [0]) * (height * self.width * 4)
+        for k, (dr, dc) in enumerate(DIRECTIONS_4):
+            rows = range(height - 1, -1, -1) if dr > 0 else range(height)
+            cols = range(self.width - 1, -1, -1) if dc > 0 else range(self.width)
+            for r in rows:
+                for c in cols:
+                    index = r * self.width + c
+                    nr, nc = r + dr, c + dc
+                    next_point = (min_row + nr, min_col + nc)
+                    if not (0 <= nr < height and 0 <= nc < self.width) or next_point not in grid:
+                        self.stops[index * 4 + k] = ~index
+                    elif grid[next_point] == blocker:
+                        self.stops[index * 4 + k] = index
+                    else:
+                        self.stops[index * 4 + k] = self.stops[(nr * self.width + nc) * 4 + k]
+
+    def jump(
+        self, point: Point, direction: Point, extra: Point | None = None
+    ) -> tuple[Point, bool]:
+        """
+        Walk from point in direction until the next blocker, returning (stop, blocked).
+
+        stop is the last cell reached, blocked is False if the walk left the grid instead.
+        extra is one more blocker laid over the table for this jump only, so trying out a
+        new blocker doesn't need a new table.
+        """
+        row, col = self.origin
+        index = (point[0] - row) * self.width + point[1] - col
+        stop = self.stops[index * 4 + DIRECTIONS_4.index(direction)]
+        blocked = stop >= 0
+        stop = stop if blocked else ~stop
+        end = (row + stop // self.width, col + stop % self.width)
+        if extra is not None:
+            dr, dc = direction
+            # How many steps along the ray the extra blocker is, if it is on it at all.
+            offset = (extra[0] - point[0]) * dr + (extra[1] - point[1]) * dc
+            reach = (end[0] - point[0]) * dr + (end[1] - point[1]) * dc
+            on_ray = (extra[0] - point[0]) * dc == (extra[1] - point[1]) * dr
+            if on_ray and 0 < offset <= reach:
+                return (extra[0] - dr, extra[1] - dc), True
+        return end, blocked
+
+
+MASK_64 = (1 << 64) - 1
+
+
+def zobrist_key(point: Point, value: Hashable) -> int:
+    """
+    A well mixed 64-bit key for a value at a point.
+
+    XORing the keys of every (point, value) in a grid gives a hash of the grid that can be
+    updated one point at a time. Mixed with the splitmix64 finaliser.
+    """
+    x = (hash((point, value)) + 0x9E3779B97F4A7C15) & MASK_64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return x ^ (x >> 31)
+
+
+type AdjacencyTable = tuple[array[int], array[int]]
+
+
+class NeighbourIndex:
+    """
+    Precomputed neighbour tables for a fixed set of grid points.
+
+    Each point is given a dense id, and the neighbours for each kind of connectivity are
+    stored in CSR form: the neighbour ids of point i are `neighbours[offsets[i]:offsets[i + 1]]`.
+    Tables are built the first time they're asked for.
+    """
+
+    def __init__(
+        self,
+        points: Iterable[Point],
+        height: int,
+        width: int,
+        directions: Sequence[Point] = DIRECTIONS_4,
+        directions_diag: Sequence[Point] = DIRECTIONS_8,
+    ) -> None:
+        self.points = list(points)
+        self.ids = {p: i for i, p in enumerate(self.points)}
+        self.height = height
+        self.width = width
+        self.directions = directions
+        self.directions_diag = directions_diag
+        self.tables: dict[tuple[bool, bool], AdjacencyTable] = {}
+
+    def table(self, diag: bool = False, wrapping: bool = False) -> AdjacencyTable:
+        """
+        Return the (offsets, neighbours) CSR arrays for the connectivity.
+        """
+        key = (diag, wrapping)
+        if key not in self.tables:
+            self.tables[key] = self._build(diag, wrapping)
+        return self.tables[key]
+
+    def _build(self, diag: bool, wrapping: bool) -> AdjacencyTable:
+        ids = self.ids
+        height = self.height
+        width = self.width
+        directions = self.directions_diag if diag else self.directions
+        offsets = array("q", [0])
+        neighbours = array("q")
+        for r, c in self.points:
+            for dr, dc in directions:
+                nr = r + dr
+                nc = c + dc
+                if wrapping:
+                    nr %= height
+                    nc %= width
+                if (nid := ids.get((nr, nc))) is not None:
+                    neighbours.append(nid)
+            offsets.append(len(neighbours))
+        return offsets, neighbours
+
+    def neighbour_ids(self, idx: int, diag: bool = False, wrapping: bool = False) -> array[int]:
+        """
+        Return the ids of the neighbours of the point with id idx.
+        """
+        offsets, neighbours = self.table(diag, wrapping)
+        return neighbours[offsets[idx] : offsets[idx + 1]]
+
+    def neighbours(
+        self, point: Point, diag: bool = False, wrapping: bool = False
+    ) -> list[Point] | None:
+        """
+        Return the neighbours of a point, or None if the point is not indexed.
+        """
+        if (idx := self.ids.get(point)) is None:
+            return None
+        points = self.points
+        return [points[nid] for nid in self.neighbour_ids(idx, diag, wrapping)]
+
+
+@dataclasses.dataclass
+class Grid[T]:
+    """
+    Models a grid of (row, column) points with a value at each point.
+    """
+
+    # When True, state_key() is checked against a full recalculation every call.
+    verify_state_keys: ClassVar[bool] = False
+
+    points: dict[Point, T]
+    _drawer: GridDrawer
+    _animating: bool = False
+    _indexed: bool = dataclasses.field(default=False, repr=False, compare=False)
+    _neighbour_index: NeighbourIndex | None = dataclasses.field(
+        default=None, repr=False, compare=False
+    )
+    _bounds: tuple[int, int, int, int] | None = dataclasses.field(
+        default=None, repr=False, compare=False
+    )
+    _value_index: dict[Any, set[Point]] | None = dataclasses.field(
+        default=None, repr=False, compare=False
+    )
+    _state: int | None = dataclasses.field(default=None, repr=False, compare=False)
+
+    def __init__(self, rows: Iterable[Iterable[T]], pad_with: T | None = None):
+        self.points = {}
+        self.pad_with = pad_with
+        rmax = cmax = -1
+        for r, row in enumerate(rows):
+            c = -1
+            for c, item in enumerate(row):
+                self.points[(r, c)] = item
+            if c >= 0:
+                rmax = r
+                cmax = max(cmax, c)
+        self._bounds = (0, rmax, 0, cmax) if self.points else None
+        self._init_caches()
+
+    def _init_caches(self) -> None:
+        """
+        Reset the animation state and every lazily built index, for use by constructors.
+        """
+        self._animating = False
+        self._drawer = GridDrawer(frames=[])
+        self._indexed = False
+        self._neighbour_index = None
+        self._value_index = None
+        self._state = None
+
+    @classmethod
+    def from_points[V](cls, points: dict[Point, V], pad_with: V | None = None) -> Grid[V]:
+        """
+        Build a grid from a mapping of points to values.
+        """
+        grid: Grid[V] = Grid(rows=[], pad_with=pad_with)
+        for point, value in points.items():
+            grid[point] = value
+        return grid
+
+    @classmethod
+    def from_number_string(
+        cls, data: str, separator: str | None = None, pad_with: int | None = None
+    ) -> Grid[int]:
+        """
+        Build a grid from a string of numbers, each row separated by a newline.
+        """
+        if separator:
+            return Grid(
+                rows=((int(n) for n in row.split(separator)) for row in data.splitlines()),
                 pad_with=pad_with,
             )
         return Grid(rows=((int(n) for n in row) for row in data.splitlines()), pad_with=pad_with)
@@ -917,6 +2085,10 @@ class Grid[T]:
     def get(self, key: Point, default: T | None = None) -> T | None:
         return self.points.get(key, default)
 
+    def items(self) -> Iterable[tuple[Point, T]]:
+        """Iterate over the (point, value) pairs"""
+        return self.points.items()
+
     def __len__(self) -> int:
         """Number of points"""
         return self.points.__len__()
@@ -935,12 +2107,53 @@ class Grid[T]:
 
     def __setitem__(self, index: Point, value: T) -> None:
         if index not in self.points:
-            with contextlib.suppress(AttributeError):
-                del self.width
-            with contextlib.suppress(AttributeError):
-                del self.height
+            self._extend_bounds(index)
+            self._neighbour_index = None
+        else:
+            if self._value_index is not None:
+                self._value_index[self.points[index]].discard(index)
+            if self._state is not None:
+                self._state ^= zobrist_key(index, self.points[index])
+        if self._value_index is not None:
+            self._value_index.setdefault(value, set()).add(index)
+        if self._state is not None:
+            self._state ^= zobrist_key(index, value)
         self.points[index] = value
 
+    def __delitem__(self, index: Point) -> None:
+        value = self.points.pop(index)
+        if self._value_index is not None:
+            self._value_index[value].discard(index)
+        if self._state is not None:
+            self._state ^= zobrist_key(index, value)
+        self._neighbour_index = None
+        rmin, rmax, cmin, cmax = self.bounds
+        if index[0] in (rmin, rmax) or index[1] in (cmin, cmax):
+            # Removed from the edge, so the grid may have shrunk.
+            self._bounds = None
+            for point in self.points:
+                self._extend_bounds(point)
+
+    def _extend_bounds(self, point: Point) -> None:
+        r, c = point
+        if self._bounds is None:
+            self._bounds = (r, r, c, c)
+            return
+        rmin, rmax, cmin, cmax = self._bounds
+        if not (rmin <= r <= rmax and cmin <= c <= cmax):
+            self._bounds = (min(rmin, r), max(rmax, r), min(cmin, c), max(cmax, c))
+
+    @property
+    def bounds(self) -> tuple[int, int, int, int]:
+        """
+        The (min row, max row, min column, max column) of the points in the grid.
+
+        Kept up to date as points are added, rather than scanning every point.
+        """
+        if self._bounds is None:
+            raise ValueError("Grid is empty")
+        return self._bounds
+
     def rows(self) -> Iterable[Sequence[T]]:
         """Iterate over the rows of the grid"""
         for r in range(self.height):
@@ -951,19 +2164,19 @@ class Grid[T]:
         for c in range(self.width):
             yield [self[r, c] for r in range(self.height)]
 
-    @cached_property
+    @property
     def width(self) -> int:
         """
         How wide the grid is.
         """
-        return max(p[1] for p in self.points) + 1
+        return self.bounds[3] + 1
 
-    @cached_property
+    @property
     def height(self) -> int:
         """
         How tall the grid is.
         """
-        return max(p[0] for p in self.points) + 1
+        return self.bounds[1] + 1
 
     @property
     def _directions(self) -> Sequence[Point]:
@@ -973,6 +2186,30 @@ class Grid[T]:
     def _directions_diag(self) -> Sequence[Point]:
         return DIRECTIONS_8
 
+    def index_neighbours(self) -> Self:
+        """
+        Precompute neighbour tables, which get_neighbours and friends will read from.
+
+        Useful for searches that ask for the neighbours of the same points many times. The
+        tables are rebuilt when a new point is added to the grid, but not when values change.
+        Grids that grow with pad_with do not use the tables.
+        """
+        self._indexed = True
+        return self
+
+    @property
+    def neighbour_index(self) -> NeighbourIndex | None:
+        """
+        The precomputed neighbour tables, if index_neighbours() has been called.
+        """
+        if not self._indexed or self.pad_with is not None:
+            return None
+        if self._neighbour_index is None:
+            self._neighbour_index = NeighbourIndex(
+                self, self.height, self.width, self._directions, self._directions_diag
+            )
+        return self._neighbour_index
+
     def get_neighbours(
         self, point: Point, diag: bool = False, directions: Sequence[Point] | None = None
     ) -> Iterable[Point]:
@@ -983,6 +2220,13 @@ class Grid[T]:
         If diag is True, return diagonal neighbours as well as 4-directional neighbours.
         """
         if directions is None:
+            if (
+                self._indexed
+                and (index := self.neighbour_index) is not None
+                and (found := index.neighbours(point, diag)) is not None
+            ):
+                yield from found
+                return
             directions = self._directions_diag if diag else self._directions
         for d in directions:
             p = sum_points(point, d)
@@ -1001,34 +2245,69 @@ class Grid[T]:
         """
         Get the neighbours of a point, wrapping around the grid if necessary.
         """
-        height = self.height
-        width = self.width
         if directions is None:
+            if (
+                self._indexed
+                and (index := self.neighbour_index) is not None
+                and (found := index.neighbours(point, diag, wrapping=True)) is not None
+            ):
+                yield from found
+                return
             directions = self._directions_diag if diag else self._directions
+        height = self.height
+        width = self.width
         for d in directions:
             p = sum_points(point, d)
             wrapped_p = (p[0] % height, p[1] % width)
             if wrapped_p in self:
                 yield wrapped_p
 
+    def index_values(self) -> Self:
+        """
+        Maintain an index of value to points, which find, find_all and count will read from.
+
+        Useful for puzzles that look up the same markers (eg "S", "E", "@") repeatedly. With
+        the index, find returns any point holding the value rather than the first.
+        """
+        index: dict[Any, set[Point]] = {}
+        for point, value in self.items():
+            index.setdefault(value, set()).add(point)
+        self._value_index = index
+        return self
+
     def find(self, value: T) -> Point:
         """
         Find the first point with the given value.
         """
-        for point, v in self.points.items():
-            if v == value:
-                return point
+        if self._value_index is not None:
+            if found := self._value_index.get(value):
+                return next(iter(found))
+        else:
+            for point, v in self.items():
+                if v == value:
+                    return point
         raise ValueError(f"{value} not found in grid")
 
     def find_all(self, value: T) -> Iterable[Point]:
         """
-        Find the first point with the given value.
+        Find all points with the given value.
         """
-        []
-        for point, v in self.points.items():
+        if self._value_index is not None:
+            # Copied, so the grid can be changed while iterating.
+            yield from list(self._value_index.get(value, ()))
+            return
+        for point, v in self.items():
             if v == value:
                 yield point
 
+    def count(self, value: T) -> int:
+        """
+        Count the points with the given value.
+        """
+        if self._value_index is not None:
+            return len(self._value_index.get(value, ()))
+        return sum(1 for _, v in self.items() if v == value)
+
     def search(
         self,
         comparison_func: Callable[[tuple[Point, T], Sequence[tuple[Point, T]]], bool],
@@ -1039,10 +2318,10 @@ class Grid[T]:
 
         Yields (point, matching_neighbour) pairs.
         """
-        for point in self.points.keys():
-            neighbours = [(n, self.points[n]) for n in self.get_neighbours(point, diag=diagonal)]
-            if comparison_func((point, self.points[point]), neighbours):
-                yield point, self.points[point]
+        for point, value in self.items():
+            neighbours = [(n, self[n]) for n in self.get_neighbours(point, diag=diagonal)]
+            if comparison_func((point, value), neighbours):
+                yield point, value
 
     def collect_while(
         self,
@@ -1071,6 +2350,227 @@ class Grid[T]:
 
     flood_fill = collect_while
 
+    def label_components(
+        self, connectivity: int = 4, key: Callable[[T], Hashable] | None = None
+    ) -> list[Component]:
+        """
+        Find every connected region of equal values in a single pass over the grid.
+
+        key maps a value to what must be equal for neighbours to connect, cells keyed as None
+        belong to no region. Each region's area, perimeter and number of corners (which is
+        also its number of sides) are counted during the same pass.
+        """
+        if connectivity not in (4, 8):
+            raise ValueError(f"connectivity must be 4 or 8, not {connectivity}")
+        points = list(self)
+        ids = {p: i for i, p in enumerate(points)}
+        keys = [self[p] if key is None else key(self[p]) for p in points]
+        parent = list(range(len(points)))
+        perimeters = [0] * len(points)
+        corners = [0] * len(points)
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        # Offsets into DIRECTIONS_8, which runs clockwise from UPLEFT.
+        orthogonal = (1, 3, 5, 7)
+        connecting = range(8) if connectivity == 8 else orthogonal
+        # (side, diagonal, side) around each corner of a cell.
+        corner_checks = ((7, 0, 1), (1, 2, 3), (3, 4, 5), (5, 6, 7))
+        for i, (r, c) in enumerate(points):
+            k = keys[i]
+            if k is None:
+                continue
+            nids = [ids.get((r + dr, c + dc)) for dr, dc in DIRECTIONS_8]
+            same = [nid is not None and keys[nid] == k for nid in nids]
+            perimeters[i] = 4 - sum(same[d] for d in orthogonal)
+            for a, diagonal, b in corner_checks:
+                external = not same[a] and not same[b]
+                internal = same[a] and same[b] and not same[diagonal]
+                corners[i] += external or internal
+            for d in connecting:
+                nid = nids[d]
+                if same[d] and nid is not None and nid < i:
+                    root, other = find(i), find(nid)
+                    if root != other:
+                        parent[max(root, other)] = min(root, other)
+
+        components: dict[int, Component] = {}
+        for i, (r, c) in enumerate(points):
+            if keys[i] is None:
+                continue
+            root = find(i)
+            if (component := components.get(root)) is None:
+                component = components[root] = Component(
+                    label=len(components), value=keys[i], bounds=(r, r, c, c)
+                )
+            rmin, rmax, cmin, cmax = component.bounds
+            if not (rmin <= r <= rmax and cmin <= c <= cmax):
+                component.bounds = (min(rmin, r), max(rmax, r), min(cmin, c), max(cmax, c))
+            component.area += 1
+            component.perimeter += perimeters[i]
+            component.corners += corners[i]
+            component.points.append((r, c))
+        return list(components.values())
+
+    def distance_field(
+        self,
+        sources: Iterable[Point],
+        passable: Callable[[T], bool] | None = None,
+        max_steps: int | None = None,
+    ) -> DistanceField:
+        """
+        Find the fewest steps from any of the sources to every reachable cell.
+
+        A breadth first search one level at a time, so there is no heap. Cells whose value
+        fails passable are never entered. Stops expanding after max_steps, if given.
+
+        >>> field = grid.distance_field([start], passable=lambda v: v != "#")
+        >>> field[end], field.reachable(64, parity=0)
+        """
+        min_row, max_row, min_col, max_col = self.bounds
+        width = max_col - min_col + 1
+        distances = array("q", [-1]) * ((max_row - min_row + 1) * width)
+        frontier: deque[Point] = deque()
+        for r, c in sources:
+            index = (r - min_row) * width + c - min_col
+            if distances[index] < 0:
+                distances[index] = 0
+                frontier.append((r, c))
+        level_sizes = []
+        distance = 0
+        while frontier:
+            level_sizes.append(len(frontier))
+            if max_steps is not None and distance >= max_steps:
+                break
+            distance += 1
+            for _ in range(len(frontier)):
+                for nb in self.get_neighbours(frontier.popleft()):
+                    index = (nb[0] - min_row) * width + nb[1] - min_col
+                    if distances[index] < 0 and (passable is None or passable(self[nb])):
+                        distances[index] = distance
+                        frontier.append(nb)
+        return DistanceField(distances, (min_row, min_col), width, level_sizes)
+
+    def ray_table(self, blocker: T) -> RayTable:
+        """
+        Precompute where a straight walk from each cell stops, for cells holding blocker.
+
+        >>> table = grid.ray_table("#")
+        >>> stop, blocked = table.jump(guard, UP, extra=obstruction)
+        """
+        return RayTable(self, blocker)
+
+    def first_disconnect(
+        self,
+        source: Point,
+        target: Point,
+        blocks: Sequence[Point],
+        passable: Callable[[T], bool] | None = None,
+        binary_search: bool = False,
+    ) -> int | None:
+        """
+        Find the first t at which blocking blocks[: t + 1] cuts source off from target.
+
+        Returns None if they stay connected with every block in place, and raises a
+        ValueError if they were never connected. Cells failing passable are always blocked.
+
+        The blocks are unblocked in reverse, joining cells in a union-find over flat cell
+        ids, until source and target meet, so it's one pass rather than a search per block.
+        With binary_search, each probe is a breadth first search that reuses one visited
+        buffer, rather than a copy of the grid.
+        """
+        min_row, max_row, min_col, max_col = self.bounds
+        width = max_col - min_col + 1
+        size = (max_row - min_row + 1) * width
+
+        def index(point: Point) -> int:
+            return (point[0] - min_row) * width + point[1] - min_col
+
+        def neighbours(i: int) -> Iterator[int]:
+            if i % width:
+                yield i - 1
+            if (i + 1) % width:
+                yield i + 1
+            if i >= width:
+                yield i - width
+            if i + width < size:
+                yield i + width
+
+        # When each cell is blocked: -1 if it never opens, len(blocks) if it is never blocked.
+        never = len(blocks)
+        blocked_at = array("q", [-1]) * size
+        for point, value in self.items():
+            if passable is None or passable(value):
+                blocked_at[index(point)] = never
+        for t in range(len(blocks) - 1, -1, -1):
+            if blocks[t] in self and blocked_at[i := index(blocks[t])] >= 0:
+                blocked_at[i] = t
+        s, g = index(source), index(target)
+
+        if binary_search:
+            visited = array("q", [-1]) * size
+            probes = itertools.count()
+
+            def connected(t: int) -> bool:
+                # Stamping visited cells with the probe number means the buffer never needs
+                # clearing between probes.
+                if blocked_at[s] <= t or blocked_at[g] <= t:
+                    return False
+                probe = next(probes)
+                visited[s] = probe
+                queue = [s]
+                for i in queue:
+                    if i == g:
+                        return True
+                    for nb in neighbours(i):
+                        if blocked_at[nb] > t and visited[nb] != probe:
+                            visited[nb] = probe
+                            queue.append(nb)
+                return False
+
+            if not connected(-1):
+                raise ValueError(f"{source} and {target} are never connected")
+            if connected(never - 1):
+                return None
+            low, high = 0, never - 1
+            while low < high:
+                middle = (low + high) // 2
+                if connected(middle):
+                    low = middle + 1
+                else:
+                    high = middle
+            return low
+
+        parent = list(range(size))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def unblock(i: int, t: int) -> None:
+            for nb in neighbours(i):
+                if blocked_at[nb] > t:
+                    parent[find(nb)] = find(i)
+
+        for i in range(size):
+            if blocked_at[i] == never:
+                unblock(i, never - 1)
+        if blocked_at[s] == never and blocked_at[g] == never and find(s) == find(g):
+            return None
+        for t in range(never - 1, -1, -1):
+            if blocks[t] not in self or blocked_at[i := index(blocks[t])] != t:
+                continue
+            unblock(i, t - 1)
+            if blocked_at[s] >= t and blocked_at[g] >= t and find(s) == find(g):
+                return t
+        raise ValueError(f"{source} and {target} are never connected")
+
     def collect_recursive(
         self,
         start: Point,
@@ -1088,11 +2588,11 @@ class Grid[T]:
             if p in seen:
                 continue
             seen.add(p)
-            neighbours = [(n, self.points[n]) for n in self.get_neighbours(p, diag=diagonal)]
-            if comparison_func((p, self.points[p]), neighbours):
+            neighbours = [(n, self[n]) for n in self.get_neighbours(p, diag=diagonal)]
+            if comparison_func((p, self[p]), neighbours):
                 found.add(p)
                 queue.extend([n[0] for n in neighbours])
-        return [(f, self.points[f]) for f in found]
+        return [(f, self[f]) for f in found]
 
     def to_graph(
         self,
@@ -1106,6 +2606,8 @@ class Grid[T]:
 
         Edges are created between neighbouring points that match the is_connected_func.
         """
+        import networkx as nx
+
         graph: nx.Graph[Point] = nx.DiGraph() if directed else nx.Graph()
         for point in self.__iter__():
             neighbours = self.get_neighbours(point, diag=diagonal)
@@ -1117,6 +2619,58 @@ class Grid[T]:
                         graph.add_edge(point, nb)
         return graph
 
+    def contract(
+        self,
+        passable: Callable[[T], bool],
+        keep: Iterable[Point] = (),
+        parallel: Literal["shortest", "longest"] = "shortest",
+    ) -> nx.Graph[Point]:
+        """
+        Build a weighted graph of junctions, collapsing each corridor into one edge.
+
+        Nodes are the passable cells that don't have exactly two passable neighbours (dead
+        ends and junctions), plus any points in keep. Each edge's weight is the number of
+        steps along its corridor, and its cells are the points walked from one end to the
+        other, which expand_contracted_path uses to map a route back onto the grid. Where
+        two corridors join the same junctions, parallel picks which one is kept: the
+        shortest for shortest path searches, or the longest for longest_path.
+
+        >>> graph = grid.contract(lambda tile: tile != "#", keep=[start, end])
+        """
+
+        import networkx as nx
+
+        def open_neighbours(point: Point) -> list[Point]:
+            return [nb for nb in self.get_neighbours(point) if passable(self[nb])]
+
+        if parallel not in ("shortest", "longest"):
+            raise ValueError(f"parallel must be shortest or longest, not {parallel!r}")
+        longest = parallel == "longest"
+        keep = set(keep)
+        junctions = {
+            point
+            for point, value in self.items()
+            if passable(value) and (point in keep or len(open_neighbours(point)) != 2)
+        }
+        graph: nx.Graph[Point] = nx.Graph()
+        graph.add_nodes_from(junctions)
+        for junction in junctions:
+            for step in open_neighbours(junction):
+                cells = [junction, step]
+                while cells[-1] not in junctions:
+                    previous, current = cells[-2], cells[-1]
+                    cells.append(next(nb for nb in open_neighbours(current) if nb != previous))
+                end = cells[-1]
+                weight = len(cells) - 1
+                if end == junction:
+                    continue
+                if graph.has_edge(junction, end):
+                    existing = graph[junction][end]["weight"]
+                    if existing >= weight if longest else existing <= weight:
+                        continue
+                graph.add_edge(junction, end, weight=weight, cells=cells)
+        return graph
+
     def replicate(self, right: int, down: int) -> Grid[T]:
         """
         Grow the grid by replicating it right and down factors.
@@ -1164,10 +2718,7 @@ class Grid[T]:
         """
         Return the grid as a Sequence of strings.
         """
-        rmin = min(self.points)[0]
-        rmax = max(self.points)[0]
-        cmin = min(node[1] for node in self.points)
-        cmax = max(node[1] for node in self.points)
+        rmin, rmax, cmin, cmax = self.bounds
 
         return [
             "".join(str(self.points.get((r, c), missing)) for c in range(cmin, cmax + 1))
@@ -1195,6 +2746,832 @@ class Grid[T]:
         """
         return "".join(self.strings())
 
+    def state_key(self) -> int:
+        """
+        A 64-bit hash of the content of the grid, for detecting repeated states.
+
+        The first call hashes every point, after which the key is kept up to date as points
+        are set, so later calls are O(1). Set Grid.verify_state_keys to check it against a
+        full recalculation.
+        """
+        if self._state is None:
+            self._state = self._full_state_key()
+        elif self.verify_state_keys:
+            expected = self._full_state_key()
+            assert self._state == expected, f"State key {self._state} != {expected}"
+        return self._state
+
+    def _full_state_key(self) -> int:
+        state = 0
+        for point, value in self.items():
+            state ^= zobrist_key(point, value)
+        return state
+
+    def as_array(self) -> NDArray[Any]:
+        """
+        Return the grid as a 2d numpy array of shape (height, width).
+
+        The cells are python objects so this is a copy. Convert once and use the array for
+        whole-grid operations rather than converting inside a loop.
+        """
+        import numpy as np
+
+        return np.array(list(self.rows()))
+
+    @classmethod
+    def from_array(cls, array: NDArray[Any]) -> Grid[Any]:
+        """
+        Build a grid from a 2d numpy array.
+        """
+        return Grid(rows=array.tolist())
+
+    def mask(self, value: T) -> NDArray[np.bool_]:
+        """
+        Return a boolean array that is True wherever the grid holds value.
+        """
+        mask: NDArray[np.bool_] = self.as_array() == value
+        return mask
+
+    def count_values(self) -> dict[T, int]:
+        """
+        Count how many times each value appears in the grid.
+        """
+        import numpy as np
+
+        if self._value_index is not None:
+            return {value: len(points) for value, points in self._value_index.items() if points}
+
+        values, counts = np.unique(self.as_array(), return_counts=True)
+        return dict(zip(values.tolist(), counts.tolist()))
+
+    def search_masked(
+        self,
+        value: T,
+        predicate: Callable[[NDArray[np.int64]], NDArray[np.bool_]],
+        diagonal: bool = False,
+    ) -> Iterable[tuple[Point, T]]:
+        """
+        A vectorised `search` for points holding value, based on their matching neighbours.
+
+        predicate receives the count of neighbours holding value for every cell at once, and
+        returns a mask of the cells to keep.
+
+        >>> grid.search_masked("@", lambda counts: counts < 4, diagonal=True)
+        """
+        mask = self.mask(value)
+        found = mask & predicate(neighbour_sum(mask, diagonal=diagonal))
+        return [(point, value) for point in mask_points(found)]
+
+
+class PointsView[T](Mapping[Point, T]):
+    """
+    A read-only Mapping of point to value over a grid that doesn't store a points dict.
+
+    Reads go straight to the grid, so nothing is copied, and writes fail rather than being
+    lost. Set values through the grid itself.
+    """
+
+    def __init__(self, grid: Grid[T]) -> None:
+        self.grid = grid
+
+    def __getitem__(self, key: Point) -> T:
+        if key not in self.grid:
+            raise KeyError(key)
+        return self.grid[key]
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, tuple) and key in self.grid
+
+    def __iter__(self) -> Iterator[Point]:
+        return iter(self.grid)
+
+    def __len__(self) -> int:
+        return len(self.grid)
+
+    def __repr__(self) -> str:
+        return f"PointsView({dict(self.grid.items())!r})"
+
+
+class DenseGrid[T](Grid[T]):
+    """
+    A fixed size Grid storing every cell in a flat row-major list.
+
+    Cells are addressed by `row * width + column`, so lookups are an index into a list
+    rather than a hash of a Point. Suited to rectangular puzzle inputs that never grow, so
+    pad_with is not supported and writes outside of the grid raise a KeyError.
+    """
+
+    cells: list[T]
+
+    def __init__(self, rows: Iterable[Iterable[T]], pad_with: T | None = None):
+        if pad_with is not None:
+            raise ValueError("DenseGrid has a fixed size and cannot be padded")
+        self.pad_with = None
+        self.cells = []
+        self._width = 0
+        self._height = 0
+        for row in rows:
+            start = len(self.cells)
+            self.cells.extend(row)
+            if self._height == 0:
+                self._width = len(self.cells)
+            elif len(self.cells) - start != self._width:
+                raise ValueError(f"Row {self._height} is not {self._width} wide")
+            self._height += 1
+        self._bounds = (0, self._height - 1, 0, self._width - 1) if self.cells else None
+        self._init_caches()
+
+    @classmethod
+    def from_number_string(
+        cls, data: str, separator: str | None = None, pad_with: int | None = None
+    ) -> DenseGrid[int]:
+        """
+        Build a grid from a string of numbers, each row separated by a newline.
+        """
+        if separator:
+            return DenseGrid(
+                rows=((int(n) for n in row.split(separator)) for row in data.splitlines()),
+                pad_with=pad_with,
+            )
+        return DenseGrid(
+            rows=((int(n) for n in row) for row in data.splitlines()), pad_with=pad_with
+        )
+
+    @classmethod
+    def from_string(
+        cls, data: str, separator: str | None = None, pad_with: str | None = None
+    ) -> DenseGrid[str]:
+        """
+        Build a grid from a string, each row separated by a newline.
+        """
+        if separator:
+            return DenseGrid(
+                rows=(row.split(separator) for row in data.splitlines()), pad_with=pad_with
+            )
+        return DenseGrid(rows=data.splitlines(), pad_with=pad_with)
+
+    @property
+    def points(self) -> Mapping[Point, T]:  # type: ignore [override]
+        """
+        A read-only view of the cells keyed by Point, for compatibility with Grid.
+        """
+        return PointsView(self)
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    def get(self, key: Point, default: T | None = None) -> T | None:
+        r, c = key
+        if 0 <= r < self._height and 0 <= c < self._width:
+            return self.cells[r * self._width + c]
+        return default
+
+    def items(self) -> Iterable[tuple[Point, T]]:
+        """Iterate over the (point, value) pairs in row-major order"""
+        width = self._width
+        for idx, value in enumerate(self.cells):
+            yield divmod(idx, width), value
+
+    def __len__(self) -> int:
+        """Number of points"""
+        return len(self.cells)
+
+    def __iter__(self) -> Iterator[Point]:
+        """Iterate over the points in row-major order"""
+        return itertools.product(range(self._height), range(self._width))
+
+    def __contains__(self, key: Point) -> bool:
+        """Check if a point is in the grid"""
+        r, c = key
+        return 0 <= r < self._height and 0 <= c < self._width
+
+    def __getitem__(self, index: Point) -> T:
+        """Get the value at a point if it exists or exception"""
+        r, c = index
+        if 0 <= r < self._height and 0 <= c < self._width:
+            return self.cells[r * self._width + c]
+        raise KeyError(index)
+
+    def __setitem__(self, index: Point, value: T) -> None:
+        r, c = index
+        if not (0 <= r < self._height and 0 <= c < self._width):
+            raise KeyError(index)
+        idx = r * self._width + c
+        if self._value_index is not None:
+            self._value_index[self.cells[idx]].discard(index)
+            self._value_index.setdefault(value, set()).add(index)
+        if self._state is not None:
+            self._state ^= zobrist_key(index, self.cells[idx]) ^ zobrist_key(index, value)
+        self.cells[idx] = value
+
+    def __delitem__(self, index: Point) -> None:
+        raise TypeError("DenseGrid has a fixed size, points cannot be removed")
+
+    def rows(self) -> Iterable[Sequence[T]]:
+        """Iterate over the rows of the grid"""
+        width = self._width
+        for start in range(0, len(self.cells), width):
+            yield self.cells[start : start + width]
+
+    def cols(self) -> Iterable[Sequence[T]]:
+        """Iterate over the columns of the grid"""
+        for c in range(self._width):
+            yield self.cells[c :: self._width]
+
+    def get_neighbours(
+        self, point: Point, diag: bool = False, directions: Sequence[Point] | None = None
+    ) -> Iterable[Point]:
+        """
+        Get the neighbours of a point.
+
+        If directions is provided, only return the neighbours in those directions.
+        If diag is True, return diagonal neighbours as well as 4-directional neighbours.
+        """
+        if directions is None:
+            if (
+                self._indexed
+                and (index := self.neighbour_index) is not None
+                and (found := index.neighbours(point, diag)) is not None
+            ):
+                yield from found
+                return
+            directions = self._directions_diag if diag else self._directions
+        r, c = point
+        height = self._height
+        width = self._width
+        for dr, dc in directions:
+            nr = r + dr
+            nc = c + dc
+            if 0 <= nr < height and 0 <= nc < width:
+                yield nr, nc
+
+    neighbours = get_neighbours
+
+    def find(self, value: T) -> Point:
+        """
+        Find the first point with the given value.
+        """
+        if self._value_index is not None:
+            return super().find(value)
+        try:
+            return divmod(self.cells.index(value), self._width)
+        except ValueError:
+            raise ValueError(f"{value} not found in grid") from None
+
+    def replicate(self, right: int, down: int) -> DenseGrid[T]:
+        """
+        Grow the grid by replicating it right and down factors.
+        """
+        assert right > 1 or down > 1, "Replication must be greater than 1 in at least one direction"
+        return DenseGrid(rows=[list(row) * right for _ in range(down) for row in self.rows()])
+
+    def rotate(self, rotations: int = 1) -> DenseGrid[T]:
+        """
+        Rotate the grid 90 degrees clockwise.
+        """
+        return DenseGrid(rows=rotate(list(self.rows()), rotations=rotations))
+
+    def transpose(self) -> DenseGrid[T]:
+        """
+        Transpose the grid, so that rows become columns and columns become rows.
+        """
+        return DenseGrid(rows=self.cols())
+
+    def strings(self, missing: T | str = "?") -> Sequence[str]:
+        """
+        Return the grid as a Sequence of strings.
+
+        Every cell of a dense grid is present, so `missing` only stands in for cells holding None.
+        """
+        if None not in self.cells:
+            return ["".join(map(str, row)) for row in self.rows()]
+        return [
+            "".join(str(missing if value is None else value) for value in row)
+            for row in self.rows()
+        ]
+
+    def as_array(self) -> NDArray[Any]:
+        """
+        Return the grid as a 2d numpy array of shape (height, width).
+        """
+        import numpy as np
+
+        return np.array(self.cells).reshape(self._height, self._width)
+
+    @classmethod
+    def from_array(cls, array: NDArray[Any]) -> DenseGrid[Any]:
+        """
+        Build a grid from a 2d numpy array.
+        """
+        return DenseGrid(rows=array.tolist())
+
+
+class SparseGrid[T](Grid[T]):
+    """
+    An unbounded Grid storing cells in fixed size square tiles keyed by tile coordinate.
+
+    Suited to grids that are discovered or grown as a puzzle runs. Bounds are kept up to
+    date as cells are set rather than recalculated, and unset cells read as default (when
+    one is given) without being stored. Points may be negative.
+    """
+
+    tiles: dict[Point, list[Any]]
+
+    def __init__(
+        self, rows: Iterable[Iterable[T]] = (), default: T | None = None, tile_size: int = 64
+    ):
+        self.pad_with = None
+        self.default = default
+        self.tile_size = tile_size
+        self.tiles = {}
+        self._count = 0
+        self._bounds = None
+        self._init_caches()
+        for r, row in enumerate(rows):
+            for c, item in enumerate(row):
+                self[r, c] = item
+
+    @property
+    def points(self) -> Mapping[Point, T]:  # type: ignore [override]
+        """
+        A read-only view of the set cells keyed by Point, for compatibility with Grid.
+        """
+        return PointsView(self)
+
+    def _locate(self, point: Point) -> tuple[Point, int]:
+        size = self.tile_size
+        r, c = point
+        return (r // size, c // size), (r % size) * size + (c % size)
+
+    def get(self, key: Point, default: T | None = None) -> T | None:
+        tile_key, offset = self._locate(key)
+        if (tile := self.tiles.get(tile_key)) is not None and tile[offset] is not SENTINEL:
+            value: T = tile[offset]
+            return value
+        return default
+
+    def items(self) -> Iterable[tuple[Point, T]]:
+        """Iterate over the (point, value) pairs of the set cells, a tile at a time"""
+        size = self.tile_size
+        for (tr, tc), tile in self.tiles.items():
+            for offset, value in enumerate(tile):
+                if value is not SENTINEL:
+                    r, c = divmod(offset, size)
+                    yield (tr * size + r, tc * size + c), value
+
+    def __len__(self) -> int:
+        """Number of set points"""
+        return self._count
+
+    def __iter__(self) -> Iterator[Point]:
+        """Iterate over the set points"""
+        return (point for point, _ in self.items())
+
+    def __contains__(self, key: Point) -> bool:
+        """Check if a point has been set"""
+        tile_key, offset = self._locate(key)
+        return (tile := self.tiles.get(tile_key)) is not None and tile[offset] is not SENTINEL
+
+    def __getitem__(self, index: Point) -> T:
+        """Get the value at a point, the default if it is unset, or exception"""
+        tile_key, offset = self._locate(index)
+        if (tile := self.tiles.get(tile_key)) is not None and tile[offset] is not SENTINEL:
+            value: T = tile[offset]
+            return value
+        if self.default is not None:
+            return self.default
+        raise KeyError(index)
+
+    def __setitem__(self, index: Point, value: T) -> None:
+        tile_key, offset = self._locate(index)
+        if (tile := self.tiles.get(tile_key)) is None:
+            tile = self.tiles[tile_key] = [SENTINEL] * (self.tile_size * self.tile_size)
+        if tile[offset] is SENTINEL:
+            self._count += 1
+            self._neighbour_index = None
+            self._extend_bounds(index)
+        else:
+            if self._value_index is not None:
+                self._value_index[tile[offset]].discard(index)
+            if self._state is not None:
+                self._state ^= zobrist_key(index, tile[offset])
+        if self._value_index is not None:
+            self._value_index.setdefault(value, set()).add(index)
+        if self._state is not None:
+            self._state ^= zobrist_key(index, value)
+        tile[offset] = value
+
+    def __delitem__(self, index: Point) -> None:
+        raise TypeError("SparseGrid points cannot be removed")
+
+    def rows(self) -> Iterable[Sequence[T]]:
+        """Iterate over the rows within the bounds of the grid"""
+        rmin, rmax, cmin, cmax = self.bounds
+        for r in range(rmin, rmax + 1):
+            yield [self[r, c] for c in range(cmin, cmax + 1)]
+
+    def cols(self) -> Iterable[Sequence[T]]:
+        """Iterate over the columns within the bounds of the grid"""
+        rmin, rmax, cmin, cmax = self.bounds
+        for c in range(cmin, cmax + 1):
+            yield [self[r, c] for r in range(rmin, rmax + 1)]
+
+    def get_neighbours(
+        self, point: Point, diag: bool = False, directions: Sequence[Point] | None = None
+    ) -> Iterable[Point]:
+        """
+        Get the neighbours of a point.
+
+        Unset neighbours are included when the grid has a default, without being stored.
+        """
+        if directions is None:
+            directions = self._directions_diag if diag else self._directions
+        r, c = point
+        include_unset = self.default is not None
+        for dr, dc in directions:
+            p = (r + dr, c + dc)
+            if include_unset or p in self:
+                yield p
+
+    neighbours = get_neighbours
+
+    def strings(self, missing: T | str = "?") -> Sequence[str]:
+        """
+        Return the grid within its bounds as a Sequence of strings.
+
+        Only the populated tiles are visited. Unset cells are shown as the default, or as
+        missing if there is no default.
+        """
+        if self._bounds is None:
+            return []
+        rmin, rmax, cmin, cmax = self._bounds
+        size = self.tile_size
+        blank = str(missing if self.default is None else self.default)
+        rows = [[blank] * (cmax - cmin + 1) for _ in range(rmax - rmin + 1)]
+        for (tr, tc), tile in self.tiles.items():
+            for offset, value in enumerate(tile):
+                if value is not SENTINEL:
+                    r, c = divmod(offset, size)
+                    rows[tr * size + r - rmin][tc * size + c - cmin] = str(value)
+        return ["".join(row) for row in rows]
+
+
+class GridView[T](Grid[T]):
+    """
+    A lazy view over a rectangular base grid, remapping points rather than copying values.
+
+    Subclasses define the shape of the view and how a view point maps to a base point.
+    Writes pass through to the base grid.
+    """
+
+    def __init__(self, base: Grid[T]):
+        self.base = base
+        self.pad_with = None
+        self._init_caches()
+
+    def _to_base(self, point: Point) -> Point:
+        raise NotImplementedError
+
+    @property
+    def points(self) -> Mapping[Point, T]:  # type: ignore [override]
+        """
+        A read-only view keyed by Point, for compatibility with Grid.
+        """
+        return PointsView(self)
+
+    @property
+    def bounds(self) -> tuple[int, int, int, int]:
+        return 0, self.height - 1, 0, self.width - 1
+
+    def get(self, key: Point, default: T | None = None) -> T | None:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def items(self) -> Iterable[tuple[Point, T]]:
+        """Iterate over the (point, value) pairs in row-major order"""
+        for point in self:
+            yield point, self[point]
+
+    def __len__(self) -> int:
+        """Number of points"""
+        return self.height * self.width
+
+    def __iter__(self) -> Iterator[Point]:
+        """Iterate over the points in row-major order"""
+        return itertools.product(range(self.height), range(self.width))
+
+    def __contains__(self, key: Point) -> bool:
+        """Check if a point is in the view"""
+        r, c = key
+        return 0 <= r < self.height and 0 <= c < self.width
+
+    def __getitem__(self, index: Point) -> T:
+        """Get the value at a point if it exists or exception"""
+        if index not in self:
+            raise KeyError(index)
+        return self.base[self._to_base(index)]
+
+    def __setitem__(self, index: Point, value: T) -> None:
+        if index not in self:
+            raise KeyError(index)
+        self.base[self._to_base(index)] = value
+
+    def __delitem__(self, index: Point) -> None:
+        raise TypeError("Points cannot be removed from a view")
+
+    def index_values(self) -> Self:
+        raise TypeError("Views read through to their base grid, index the base grid instead")
+
+    def state_key(self) -> int:
+        """
+        The state key of the base grid, which the view is a fixed remapping of.
+        """
+        return self.base.state_key()
+
+    def strings(self, missing: T | str = "?") -> Sequence[str]:
+        """
+        Return the view as a Sequence of strings.
+        """
+        return ["".join(map(str, row)) for row in self.rows()]
+
+
+class TransposedView[T](GridView[T]):
+    """
+    A view of a grid with rows as columns and columns as rows.
+    """
+
+    @property
+    def height(self) -> int:
+        return self.base.width
+
+    @property
+    def width(self) -> int:
+        return self.base.height
+
+    def _to_base(self, point: Point) -> Point:
+        return point[1], point[0]
+
+
+class RotatedView[T](GridView[T]):
+    """
+    A view of a grid rotated 90 degrees clockwise a number of times.
+    """
+
+    def __init__(self, base: Grid[T], rotations: int = 1):
+        super().__init__(base)
+        self.rotations = rotations % 4
+
+    @property
+    def height(self) -> int:
+        return self.base.width if self.rotations % 2 else self.base.height
+
+    @property
+    def width(self) -> int:
+        return self.base.height if self.rotations % 2 else self.base.width
+
+    def _to_base(self, point: Point) -> Point:
+        r, c = point
+        match self.rotations:
+            case 1:
+                return self.base.height - 1 - c, r
+            case 2:
+                return self.base.height - 1 - r, self.base.width - 1 - c
+            case 3:
+                return c, self.base.width - 1 - r
+        return point
+
+
+class TiledView[T](GridView[T]):
+    """
+    A view of a grid repeated right and down times, like replicate without the copy.
+
+    transform is called with (value, tile row, tile column) to alter the value in each tile.
+    Writes are not supported, as every tile shares the same base points.
+
+        >>> TiledView(grid, 5, 5, transform=lambda value, tr, tc: value + tr + tc)
+    """
+
+    def __init__(
+        self,
+        base: Grid[T],
+        right: int,
+        down: int,
+        transform: Callable[[T, int, int], T] | None = None,
+    ):
+        super().__init__(base)
+        self.right = right
+        self.down = down
+        self.transform = transform
+
+    @property
+    def height(self) -> int:
+        return self.base.height * self.down
+
+    @property
+    def width(self) -> int:
+        return self.base.width * self.right
+
+    def _to_base(self, point: Point) -> Point:
+        return point[0] % self.base.height, point[1] % self.base.width
+
+    def __getitem__(self, index: Point) -> T:
+        """Get the value at a point if it exists or exception"""
+        if index not in self:
+            raise KeyError(index)
+        value = self.base[self._to_base(index)]
+        if self.transform is None:
+            return value
+        return self.transform(value, index[0] // self.base.height, index[1] // self.base.width)
+
+    def __setitem__(self, index: Point, value: T) -> None:
+        raise TypeError("TiledView is read only, every tile shares the same base points")
+
+
+class BitGrid:
+    """
+    A fixed size boolean grid storing each row as an int, where bit c is column c.
+
+    Whole-grid operations (shifts, and/or/xor, counting) work a row at a time rather than a
+    point at a time, which suits occupancy layers that would otherwise be a set of Points.
+    """
+
+    bits: list[int]
+
+    def __init__(self, bits: Iterable[int], width: int) -> None:
+        self.bits = list(bits)
+        self.width = width
+        self.full = (1 << width) - 1
+
+    @classmethod
+    def empty(cls, height: int, width: int) -> BitGrid:
+        return BitGrid([0] * height, width)
+
+    @classmethod
+    def from_points(cls, points: Iterable[Point], height: int, width: int) -> BitGrid:
+        """
+        Build a grid with the given points set. Points outside of the grid are ignored.
+        """
+        grid = BitGrid.empty(height, width)
+        for r, c in points:
+            if 0 <= r < height and 0 <= c < width:
+                grid.add((r, c))
+        return grid
+
+    @classmethod
+    def from_grid[T](cls, grid: Grid[T], on: Collection[T]) -> BitGrid:
+        """
+        Build a grid with a bit set wherever the grid holds a value in on.
+
+        >>> BitGrid.from_grid(grid, "#O")
+        """
+        bits = [sum(1 << c for c, value in enumerate(row) if value in on) for row in grid.rows()]
+        return BitGrid(bits, grid.width)
+
+    def to_grid(self, on: str = "#", off: str = ".") -> Grid[str]:
+        """
+        Convert to a Grid of on/off strings.
+        """
+        return Grid(rows=self.strings(on, off))
+
+    @property
+    def height(self) -> int:
+        return len(self.bits)
+
+    def __contains__(self, point: Point) -> bool:
+        """Check if the bit at a point is set"""
+        r, c = point
+        return 0 <= r < len(self.bits) and 0 <= c < self.width and bool(self.bits[r] >> c & 1)
+
+    def __getitem__(self, point: Point) -> bool:
+        return point in self
+
+    def __setitem__(self, point: Point, value: bool) -> None:
+        if value:
+            self.add(point)
+        else:
+            self.discard(point)
+
+    def add(self, point: Point) -> None:
+        r, c = point
+        self.bits[r] |= 1 << c
+
+    def discard(self, point: Point) -> None:
+        r, c = point
+        self.bits[r] &= ~(1 << c)
+
+    def __iter__(self) -> Iterator[Point]:
+        """Iterate over the points that are set"""
+        for r, row in enumerate(self.bits):
+            while row:
+                low = row & -row
+                yield r, low.bit_length() - 1
+                row ^= low
+
+    def __len__(self) -> int:
+        """Number of points that are set"""
+        return self.count()
+
+    def count(self) -> int:
+        """Count the set bits"""
+        return sum(row.bit_count() for row in self.bits)
+
+    def __bool__(self) -> bool:
+        return any(self.bits)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BitGrid):
+            return NotImplemented
+        return self.width == other.width and self.bits == other.bits
+
+    def _check_shape(self, other: BitGrid) -> None:
+        if self.width != other.width or self.height != other.height:
+            raise ValueError(
+                f"Grids differ in shape: {self.height}x{self.width} and "
+                f"{other.height}x{other.width}"
+            )
+
+    def __and__(self, other: BitGrid) -> BitGrid:
+        self._check_shape(other)
+        return BitGrid((a & b for a, b in zip(self.bits, other.bits)), self.width)
+
+    def __or__(self, other: BitGrid) -> BitGrid:
+        self._check_shape(other)
+        return BitGrid((a | b for a, b in zip(self.bits, other.bits)), self.width)
+
+    def __xor__(self, other: BitGrid) -> BitGrid:
+        self._check_shape(other)
+        return BitGrid((a ^ b for a, b in zip(self.bits, other.bits)), self.width)
+
+    def __sub__(self, other: BitGrid) -> BitGrid:
+        """Bits set in self but not in other"""
+        self._check_shape(other)
+        return BitGrid((a & ~b for a, b in zip(self.bits, other.bits)), self.width)
+
+    def __invert__(self) -> BitGrid:
+        return BitGrid((~row & self.full for row in self.bits), self.width)
+
+    def shift(self, direction: Point, steps: int = 1) -> BitGrid:
+        """
+        Move every set bit in direction, dropping bits that fall off the edge.
+
+        >>> grid.shift(RIGHT)  # (r, c) -> (r, c + 1)
+        """
+        dr = direction[0] * steps
+        dc = direction[1] * steps
+        full = self.full
+        if dc >= 0:
+            rows = [(row << dc) & full for row in self.bits]
+        else:
+            rows = [row >> -dc for row in self.bits]
+        height = self.height
+        if dr > 0:
+            rows = [0] * min(dr, height) + rows[: max(height - dr, 0)]
+        elif dr < 0:
+            rows = rows[-dr:] + [0] * min(-dr, height)
+        return BitGrid(rows, self.width)
+
+    def neighbours(self, diag: bool = False, directions: Sequence[Point] | None = None) -> BitGrid:
+        """
+        Return the cells neighbouring any set bit.
+
+        If directions is provided, only neighbours in those directions are included.
+        """
+        if directions is None:
+            directions = DIRECTIONS_8 if diag else DIRECTIONS_4
+        found = BitGrid.empty(self.height, self.width)
+        for direction in directions:
+            found |= self.shift(direction)
+        return found
+
+    def hash_key(self) -> tuple[int, ...]:
+        """
+        Make a hashable key out of the content of the grid.
+        """
+        return tuple(self.bits)
+
+    def strings(self, on: str = "#", off: str = ".") -> Sequence[str]:
+        """
+        Return the grid as a Sequence of strings.
+        """
+        return [
+            "".join(on if row >> c & 1 else off for c in range(self.width)) for row in self.bits
+        ]
+
+    def print(self, on: str = "#", off: str = ".") -> None:
+        """
+        Print the grid to the console.
+        """
+        for row in self.strings(on, off):
+            print(row)
+        print()
+
 
 class NotAnimating(Exception):
     pass
@@ -1212,6 +3589,8 @@ class GridAnimator:
     @contextmanager
     def animate(self, grid: Grid[A]) -> Iterator[Self]:
         if self.animating:
+            from rich import live
+
             with live.Live(self._get_content(grid), auto_refresh=False) as renderer:
                 self.renderer = renderer
                 yield self
@@ -1226,6 +3605,8 @@ class GridAnimator:
         self.renderer.update(self._get_content(grid), refresh=True)
 
     def _get_content(self, grid: Grid[A]) -> panel.Panel:
+        from rich import panel
+
         s = ""
         for row in grid.strings():
             s += row
@@ -1303,6 +3684,8 @@ class GridDrawer:
                 existing.unlink()
 
     def draw(self, color_map: ColorMap = DEFAULT_COLOR_MAP) -> None:
+        import multiprocessing
+
         target_dir = pathlib.Path("./animations/")
         if not target_dir.exists():
             target_dir.mkdir(parents=True, exist_ok=True)
@@ -1464,6 +3847,73 @@ class Color(StrEnum):
         return f"[bold {self.value}]{text}[/bold {self.value}]"
 
 
+# Puzzle inputs live beside the year folders, as inputs/{year}/{day}.txt.
+INPUTS = pathlib.Path(__file__).resolve().parent / "inputs"
+
+
+def read_input(path: str | pathlib.Path) -> str:
+    """
+    Read a puzzle input through mmap, decoding straight from the mapped pages.
+
+    Trailing newlines are dropped (as aocd does) without slicing a copy of the text.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            end = len(mapped)
+            while end and mapped[end - 1] in b"\r\n":
+                end -= 1
+            with memoryview(mapped) as view, view[:end] as text:
+                return str(text, "utf-8")
+
+
+@dataclasses.dataclass
+class InputStore:
+    """
+    Puzzle inputs kept on disk, so a run costs one file read rather than a trip through aocd.
+
+    Inputs are looked up at root / template. On a miss aocd is the last resort, and what it
+    returns is saved so the next run is local.
+    """
+
+    root: pathlib.Path = INPUTS
+    template: str = "{year}/{day}.txt"
+    fetch: bool = True
+
+    def path(self, year: int, day: int) -> pathlib.Path:
+        return self.root / self.template.format(year=year, day=day)
+
+    def get(self, year: int, day: int) -> Input | None:
+        """
+        Return the stored input, or None when there isn't one.
+        """
+        try:
+            return Input(data=read_input(self.path(year, day)))
+        except FileNotFoundError:
+            return None
+
+    def save(self, year: int, day: int, data: str) -> pathlib.Path:
+        path = self.path(year, day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(data)
+        return path
+
+    def load(self, year: int, day: int) -> Input:
+        """
+        Return the stored input, falling back to aocd (and storing the result).
+        """
+        if (stored := self.get(year, day)) is not None:
+            return stored
+        if not self.fetch:
+            raise FileNotFoundError(self.path(year, day))
+        import aocd
+
+        data = aocd.get_data(day=day, year=year)
+        self.save(year, day, data)
+        return Input(data=data)
+
+
 @dataclasses.dataclass
 class Puzzle:
     year: int
@@ -1475,6 +3925,7 @@ class Puzzle:
     testing: bool = False
     no_tests: bool = False
     animate: bool = False
+    input_store: InputStore = dataclasses.field(default_factory=InputStore)
 
     def part_one(self, input: Input) -> str | int:
         return ""
@@ -1491,10 +3942,17 @@ class Puzzle:
     def both_parts(self, input: Input) -> tuple[str | int, str | int]:
         return "", ""
 
-    def get_input(self, year: int, day: int) -> Input:
-        return Input(data=aocd.get_data(day=day, year=year))
+    def get_input(self, year: int, day: int, path: str | None = None) -> Input:
+        """
+        Return the puzzle input from path if given, otherwise from the input store.
+        """
+        if path is not None:
+            return Input(data=read_input(path))
+        return self.input_store.load(year, day)
 
     def cli(self: Self) -> Callable[[], None]:
+        import rich_click as click
+
         puzzle_runner = self
 
         @click.command()
@@ -1503,6 +3961,12 @@ class Puzzle:
         @click.option("--animate", is_flag=True, help="Run the animation if one exists")
         @click.option("--test", "-t", is_flag=True, help="Run tests")
         @click.option("--alt", "-a", is_flag=True, help="Run alternative")
+        @click.option(
+            "--input",
+            "input_path",
+            type=click.Path(exists=True, dir_okay=False),
+            help="Read the puzzle input from this file",
+        )
         @click.option(
             "--fail-fast",
             "--ff",
@@ -1511,7 +3975,13 @@ class Puzzle:
             help="Stop on first test failure (implies --test)",
         )
         def entrypoint(
-            p1: bool, p2: bool, animate: bool, test: bool, fail_fast: bool, alt: bool
+            p1: bool,
+            p2: bool,
+            animate: bool,
+            test: bool,
+            fail_fast: bool,
+            alt: bool,
+            input_path: str | None,
         ) -> None:
             if not (p1 or p2 or test):
                 # default, run it all
@@ -1564,7 +4034,9 @@ class Puzzle:
             if not (p1 or p2 or puzzle_runner.both):
                 return
 
-            input_data = puzzle_runner.get_input(puzzle_runner.year, puzzle_runner.day)
+            input_data = puzzle_runner.get_input(
+                puzzle_runner.year, puzzle_runner.day, path=input_path
+            )
             click.echo()
             a1: int | str = click.style("Skipped", fg="yellow")
             a2 = a1